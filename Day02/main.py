@@ -1,30 +1,60 @@
 #!/usr/bin/env python3
 
 import itertools
-import fileinput
-import operator
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from intcode import (  # noqa: E402 pylint: disable=wrong-import-position
+    HALTED, IntCodeInterpreter, Polynomial, SymbolicError, execute_symbolic, parse_program,
+    read_program, solve, supervise, sweep,
+)
+
+# a noun and verb whose run takes longer than this are taken for an endless loop
+MAX_INSTRUCTIONS = 10 ** 6
 
 
 def execute(program, noun=None, verb=None):
-    numbers = [int(number) for number in program.split(',')]
-    if noun:
-        numbers[1] = noun
-    if verb:
-        numbers[2] = verb
-
-    opcodes = {
-        1: operator.add,
-        2: operator.mul,
-    }
-    for index in range(0, len(numbers) - 3, 4):
-        opcode, index_input1, index_input2, index_output = numbers[index:index+4]
-        if opcode == 99:
-            break
-        numbers[index_output] = opcodes[opcode](numbers[index_input1], numbers[index_input2])
-    final_state = ','.join(str(number) for number in numbers)
+    numbers = parse_program(program)
+    interpreter = IntCodeInterpreter(numbers)
+    if noun is not None:
+        interpreter.write(1, noun)
+    if verb is not None:
+        interpreter.write(2, verb)
+    interpreter.execute()
+    final_state = ','.join(str(number) for number in interpreter.memory.cells(0, len(numbers)))
     return final_state
 
 
+def first_output(numbers, noun_verb):
+    interpreter = IntCodeInterpreter(numbers)
+    interpreter.write(1, noun_verb[0])
+    interpreter.write(2, noun_verb[1])
+    status = supervise(interpreter, max_instructions=MAX_INSTRUCTIONS)
+    return interpreter.read(0) if status.outcome == HALTED else None
+
+
+def find_noun_verb(numbers, target):
+    # address 0 usually is a polynomial in noun and verb, which is solved directly
+    ranges = {'noun': range(100), 'verb': range(100)}
+    try:
+        memory, _ = execute_symbolic(
+            numbers, {1: Polynomial.variable('noun'), 2: Polynomial.variable('verb')},
+        )
+        for solution in solve(memory[0], target, ranges):
+            return solution['noun'], solution['verb']
+        return None
+    except SymbolicError:
+        pass
+    # the program branches on noun or verb, run every pair until one gives the target
+    pairs = itertools.product(*ranges.values())
+    for noun_verb, output in sweep(first_output, numbers, pairs):
+        if output == target:
+            return noun_verb
+    return None
+
+
 def test_task1():
     assert execute('1,0,0,0,99') == '2,0,0,0,99'
     assert execute('2,3,0,3,99') == '2,3,0,6,99'
@@ -34,24 +64,27 @@ def test_task1():
 
 
 def solve_task1():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     final_state = execute(program, noun=12, verb=2)
     output = int(final_state.split(',')[0])
     print(f'answer to task 1: {output}')
 
 
 def test_task2():
+    assert find_noun_verb(parse_program('1101,0,0,0,99'), 150) == (51, 99)
+    assert find_noun_verb(parse_program('1,0,0,0,99'), 2) == (0, 0)
+    # errors of the symbolic run are left to the concrete one, where no pair gives the target
+    assert find_noun_verb(parse_program('1101,0,0,0,1,-1,0,0,99'), 0) is None
+    assert find_noun_verb(parse_program('1101,0,0,0,3,0,99'), 0) is None
+    # reads the cell addressed by the verb, which is symbolic, and multiplies it with the verb
+    assert find_noun_verb([1, 0, 0, 13, 2, 2, 13, 14, 1, 1, 14, 0, 99, 0, 0], 150) == (0, 10)
     print('tests for task 2: ok')
 
 
 def solve_task2():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
-    for noun, verb in itertools.product(range(100), range(100)):
-        final_state = execute(program, noun=noun, verb=verb)
-        output = int(final_state.split(',')[0])
-        if output == 19690720:
-            print(f'answer to task 2: {100 * noun + verb}')
-            break
+    program = read_program()
+    noun, verb = find_noun_verb(parse_program(program), 19690720)
+    print(f'answer to task 2: {100 * noun + verb}')
 
 
 def main():
@@ -1,83 +1,32 @@
 #!/usr/bin/env python3
 
-from enum import IntEnum
-import fileinput
+import json
+import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-class OPCODE(IntEnum):
-    ADD = 1
-    MULTIPLY = 2
-    INPUT = 3
-    OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    HALT = 99
+from intcode import (  # noqa: E402 pylint: disable=wrong-import-position
+    FusingIntCodeInterpreter, IntCodeInterpreter, Timeline, TimelineIntCodeInterpreter,
+    read_program,
+)
 
 
-class MODE(IntEnum):
-    POSITION = 0
-    IMMEDIATE = 1
-
-
-def parse_arguments(numbers, ip, num_arguments):
-    modes = reversed(str(numbers[ip] // 100).rjust(num_arguments, '0'))
-    arguments = numbers[ip+1:ip+1+num_arguments]
-    return [
-        numbers[argument] if int(mode) == MODE.POSITION else argument
-        for mode, argument in zip(modes, arguments)
-    ]
-
-
-def execute(program, system_id):
-    numbers = [int(number) for number in program.split(',')]
-    ip, output = 0, []
-    while True:
-        opcode = numbers[ip] % 100
-        if opcode == OPCODE.ADD:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = arguments[0] + arguments[1]
-            ip += 4
-        elif opcode == OPCODE.MULTIPLY:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = arguments[0] * arguments[1]
-            ip += 4
-        elif opcode == OPCODE.INPUT:
-            numbers[numbers[ip+1]] = system_id
-            ip += 2
-        elif opcode == OPCODE.OUTPUT:
-            arguments = parse_arguments(numbers, ip, num_arguments=1)
-            output.append(arguments[0])
-            ip += 2
-        elif opcode == OPCODE.JUMP_IF_TRUE:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            ip = arguments[1] if arguments[0] != 0 else ip + 3
-        elif opcode == OPCODE.JUMP_IF_FALSE:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            ip = arguments[1] if arguments[0] == 0 else ip + 3
-        elif opcode == OPCODE.LESS_THAN:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = 1 if arguments[0] < arguments[1] else 0
-            ip += 4
-        elif opcode == OPCODE.EQUALS:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = 1 if arguments[0] == arguments[1] else 0
-            ip += 4
-        elif opcode == OPCODE.HALT:
-            break
-    return output
+def execute(program, system_id, interpreter_class=IntCodeInterpreter):
+    interpreter = interpreter_class(program, inputs=[system_id])
+    interpreter.execute()
+    return interpreter.outputs
 
 
 def test_task1():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     output = execute(program, system_id=1)
     assert all(number == 0 for number in output[:-1])
     print('tests for task 1: ok')
 
 
 def solve_task1():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     output = execute(program, system_id=1)
     print(f'answer to task 1: {output[-1]}')
 
@@ -98,11 +47,33 @@ def test_task2():
     assert execute('3,21,1008,21,8,20,1005,20,22,107,8,21,20,1006,20,31,1106,0,36,98,0,0,1002,21,125,20,4,20,1105,1,46,104,999,1105,1,46,1101,1000,1,20,4,20,1105,1,46,98,99', system_id=7)[0] == 999  # noqa: max_line_length
     assert execute('3,21,1008,21,8,20,1005,20,22,107,8,21,20,1006,20,31,1106,0,36,98,0,0,1002,21,125,20,4,20,1105,1,46,104,999,1105,1,46,1101,1000,1,20,4,20,1105,1,46,98,99', system_id=8)[0] == 1000  # noqa: max_line_length
     assert execute('3,21,1008,21,8,20,1005,20,22,107,8,21,20,1006,20,31,1106,0,36,98,0,0,1002,21,125,20,4,20,1105,1,46,104,999,1105,1,46,1101,1000,1,20,4,20,1105,1,46,98,99', system_id=9)[0] == 1001  # noqa: max_line_length
+    # the fusing interpreter has to agree, also on comparisons which are not followed by a jump
+    for program, system_id in [
+            ('3,9,8,9,10,9,4,9,99,-1,8', 8), ('3,3,1107,-1,8,3,4,3,99', 7),
+            ('3,12,6,12,15,1,13,14,13,4,13,99,-1,0,1,9', 1), ('3,0,1108,1,1,9,4,9,99,0', 0),
+            ('3,0,1108,1,1,7,99,0', 0),
+            (read_program(), 5),
+    ]:
+        assert execute(program, system_id, FusingIntCodeInterpreter) == execute(program, system_id)
+    # the timeline of a short run is valid JSON, its spans follow each other on the machine track
+    timeline = Timeline()
+    interpreter = TimelineIntCodeInterpreter('3,9,8,9,10,9,4,9,99,-1,8', timeline=timeline)
+    machine = interpreter.run()
+    assert next(machine) is None and machine.send(8) == 1 and list(machine) == []
+    events = [
+        event for event in json.loads(timeline.to_json())['traceEvents']
+        if event['tid'] == interpreter.tid and event['ph'] != 'M'
+    ]
+    assert [event['name'] for event in events] == ['run', 'wait', 'resume', 'run', 'output']
+    spans = [event for event in events if event['ph'] == 'X']
+    assert all(span['dur'] >= 0 for span in spans)
+    assert all(span['ts'] + span['dur'] <= following['ts']
+               for span, following in zip(spans, spans[1:]))
     print('tests for task 2: ok')
 
 
 def solve_task2():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     output = execute(program, system_id=5)
     print(f'answer to task 2: {output[0]}')
 
@@ -1,150 +1,72 @@
 #!/usr/bin/env python3
 
-from enum import IntEnum
-import fileinput
+import functools
 import itertools
+import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-class OPCODE(IntEnum):
-    ADD = 1
-    MULTIPLY = 2
-    INPUT = 3
-    OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    HALT = 99
+from intcode import (  # noqa: E402 pylint: disable=wrong-import-position
+    BLOCKED, KILLED, IntCodeInterpreter, Network, Scheduler, ShardedNetwork, chain, parse_program,
+    read_program, ring, sweep,
+)
 
 
-class MODE(IntEnum):
-    POSITION = 0
-    IMMEDIATE = 1
+def execute(program, inputs):
+    interpreter = IntCodeInterpreter(program, inputs=inputs)
+    interpreter.execute()
+    return interpreter.outputs
 
 
-def parse_arguments(numbers, ip, num_arguments):
-    modes = reversed(str(numbers[ip] // 100).rjust(num_arguments, '0'))
-    arguments = numbers[ip+1:ip+1+num_arguments]
-    return [
-        numbers[argument] if int(mode) == MODE.POSITION else argument
-        for mode, argument in zip(modes, arguments)
-    ]
+def amplifier(program):
+    return lambda phase, signal: execute(program, inputs=[phase, signal])[0]
 
 
-def execute(program, inputs):
-    numbers = [int(number) for number in program.split(',')]
-    ip, output, input_index = 0, [], 0
-    while True:
-        opcode = numbers[ip] % 100
-        if opcode == OPCODE.ADD:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = arguments[0] + arguments[1]
-            ip += 4
-        elif opcode == OPCODE.MULTIPLY:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = arguments[0] * arguments[1]
-            ip += 4
-        elif opcode == OPCODE.INPUT:
-            numbers[numbers[ip+1]] = inputs[input_index]
-            input_index += 1
-            ip += 2
-        elif opcode == OPCODE.OUTPUT:
-            arguments = parse_arguments(numbers, ip, num_arguments=1)
-            output.append(arguments[0])
-            ip += 2
-        elif opcode == OPCODE.JUMP_IF_TRUE:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            ip = arguments[1] if arguments[0] != 0 else ip + 3
-        elif opcode == OPCODE.JUMP_IF_FALSE:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            ip = arguments[1] if arguments[0] == 0 else ip + 3
-        elif opcode == OPCODE.LESS_THAN:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = 1 if arguments[0] < arguments[1] else 0
-            ip += 4
-        elif opcode == OPCODE.EQUALS:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = 1 if arguments[0] == arguments[1] else 0
-            ip += 4
-        elif opcode == OPCODE.HALT:
-            break
-    return output
-
-
-def max_thruster_signal(program):
-    max_signal = -1000000000
-    for phases in itertools.permutations(range(5)):
-        amplifier_output = 0
-        for phase in phases:
-            amplifier_output = execute(program, inputs=[phase, amplifier_output])[0]
-        max_signal = max(max_signal, amplifier_output)
-    return max_signal
-
-
-def execute2(program, inputs):
-    numbers = [int(number) for number in program.split(',')]
-    ip, output, input_index = 0, [], 0
-    while True:
-        opcode = numbers[ip] % 100
-        if opcode == OPCODE.ADD:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = arguments[0] + arguments[1]
-            ip += 4
-        elif opcode == OPCODE.MULTIPLY:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = arguments[0] * arguments[1]
-            ip += 4
-        elif opcode == OPCODE.INPUT:
-            try:
-                numbers[numbers[ip+1]] = inputs[input_index]
-            except IndexError:
-                return output, True
-            input_index += 1
-            ip += 2
-        elif opcode == OPCODE.OUTPUT:
-            arguments = parse_arguments(numbers, ip, num_arguments=1)
-            output.append(arguments[0])
-            ip += 2
-        elif opcode == OPCODE.JUMP_IF_TRUE:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            ip = arguments[1] if arguments[0] != 0 else ip + 3
-        elif opcode == OPCODE.JUMP_IF_FALSE:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            ip = arguments[1] if arguments[0] == 0 else ip + 3
-        elif opcode == OPCODE.LESS_THAN:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = 1 if arguments[0] < arguments[1] else 0
-            ip += 4
-        elif opcode == OPCODE.EQUALS:
-            arguments = parse_arguments(numbers, ip, num_arguments=2)
-            numbers[numbers[ip+3]] = 1 if arguments[0] == arguments[1] else 0
-            ip += 4
-        elif opcode == OPCODE.HALT:
-            break
-    return output, False
-
-
-def max_thruster_signal2(program):
-    max_signal = -1000000000
-    for phases in itertools.permutations(range(5, 10)):
-        inputs = [
-            [phases[0], 0],
-            [phases[1]],
-            [phases[2]],
-            [phases[3]],
-            [phases[4]],
-        ]
-        amplifier_output = []
-        while True:
-            for amplifier, _ in enumerate(phases):
-                amplifier_output, error = execute2(
-                    program,
-                    inputs=inputs[amplifier] + amplifier_output
-                )
-            if not error:
-                break
-        max_signal = max(max_signal, amplifier_output[-1])
-    return max_signal
+def search_thruster_signal(amplify, phases, signal=0):
+    # walks the tree of phase permutations depth first, so the output of an amplifier is computed
+    # once for all permutations sharing the phases up to it
+    if not phases:
+        return signal
+    return max(
+        search_thruster_signal(amplify, phases - {phase}, amplify(phase, signal))
+        for phase in phases
+    )
+
+
+def subtree_thruster_signal(program, parameter):
+    first, phases = parameter
+    # amplifiers with the same phase and input signal give the same output in any position
+    amplify = functools.lru_cache(maxsize=None)(amplifier(program))
+    return search_thruster_signal(amplify, phases - {first}, amplify(first, 0))
+
+
+def max_thruster_signal(program, phases=range(5), processes=None):
+    # the subtrees below the phase of the first amplifier are searched in parallel
+    phases = frozenset(phases)
+    return max(
+        signal for _, signal in sweep(
+            subtree_thruster_signal, parse_program(program), [(first, phases) for first in phases],
+            processes=processes, chunk_size=1,
+        )
+    )
+
+
+def thruster_signal2(program, phases):
+    amplifiers = [IntCodeInterpreter(program, inputs=[phase]) for phase in phases]
+    network = Network(amplifiers, chain(len(amplifiers), feedback=True))
+    network.send(0, 0)
+    network.run()
+    return network.outputs[-1][-1]
+
+
+def max_thruster_signal2(program, processes=None):
+    return max(
+        signal for _, signal in sweep(
+            thruster_signal2, parse_program(program), itertools.permutations(range(5, 10)),
+            processes=processes, chunk_size=8,
+        )
+    )
 
 
 def test_task1():
@@ -153,18 +75,38 @@ def test_task1():
 
 
 def solve_task1():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     output = max_thruster_signal(program)
     print(f'answer to task 1: {output}')
 
 
 def test_task2():
     assert max_thruster_signal2('3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5') == 139629729  # noqa: max_line_length
+    # the feedback loop split over worker processes gives the same signal as the local network
+    program = parse_program('3,52,1001,52,-5,52,3,53,1,52,56,54,1007,54,5,55,1005,55,26,1001,54,-5,54,1105,1,12,1,53,54,53,1008,54,0,55,1001,55,1,55,2,53,55,53,4,53,1001,56,-1,56,1005,56,6,99,0,0,0,0,10')  # noqa: max_line_length
+    phases = (9, 7, 8, 5, 6)
+    network = ShardedNetwork([program] * len(phases), ring(len(phases)),
+                             inputs=[[phase] for phase in phases], shards=2)
+    network.send(0, 0)
+    assert network.run() and network.shards == 2
+    assert network.outputs[-1][-1] == thruster_signal2(program, phases) == 18216
+    # an amplifier waiting for its signal is parked, looping ones are killed by hand or by budget
+    scheduler = Scheduler(slice_instructions=100)
+    waiting = scheduler.submit('3,9,1001,9,1,9,4,9,99,0')
+    looping = scheduler.submit('1105,1,0')
+    limited = scheduler.submit('1105,1,0', max_instructions=1000)
+    assert not scheduler.run(max_slices=20)
+    scheduler.kill(looping)
+    assert not scheduler.run()
+    assert (waiting.state, looping.state, limited.state) == (BLOCKED, KILLED, KILLED)
+    assert limited.instructions == 1000
+    scheduler.send(waiting, 41)
+    assert scheduler.run() and waiting.outputs == [42] and looping.state == KILLED
     print('tests for task 2: ok')
 
 
 def solve_task2():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     output = max_thruster_signal2(program)
     print(f'answer to task 2: {output}')
 
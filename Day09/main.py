@@ -1,120 +1,87 @@
 #!/usr/bin/env python3
 
-from enum import IntEnum
-import fileinput
-
-
-class OPCODE(IntEnum):
-    ADD = 1
-    MULTIPLY = 2
-    INPUT = 3
-    OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    ADJUST = 9
-    HALT = 99
-
-
-class MODE(IntEnum):
-    POSITION = 0
-    IMMEDIATE = 1
-    RELATIVE = 2
-
-
-def read(memory, instruction_pointer, base_address, mode):
-    mode = int(mode)
-    if mode == MODE.POSITION:
-        return memory[memory[instruction_pointer]]
-    elif mode == MODE.IMMEDIATE:
-        return memory[instruction_pointer]
-    elif mode == MODE.RELATIVE:
-        return memory[base_address + memory[instruction_pointer]]
-
-
-def write(memory, instruction_pointer, base_address, mode, result):
-    mode = int(mode)
-    if mode == MODE.POSITION:
-        memory[memory[instruction_pointer]] = result
-    elif mode == MODE.RELATIVE:
-        memory[base_address + memory[instruction_pointer]] = result
-
-
-def execute(program, inputs=None):
-    memory = [int(number) for number in program.split(',')] + [0 for _ in range(1000)]
-    instruction_pointer, base_address, input_index, outputs = 0, 0, 0, []
-    while True:
-        opcode = memory[instruction_pointer] % 100
-        modes = list(reversed(str(memory[instruction_pointer] // 100).rjust(4, '0')))
-        if opcode == OPCODE.ADD:
-            arg1 = read(memory, instruction_pointer + 1, base_address, modes[0])
-            arg2 = read(memory, instruction_pointer + 2, base_address, modes[1])
-            result = arg1 + arg2
-            write(memory, instruction_pointer + 3, base_address, modes[2], result)
-            instruction_pointer += 4
-        elif opcode == OPCODE.MULTIPLY:
-            arg1 = read(memory, instruction_pointer + 1, base_address, modes[0])
-            arg2 = read(memory, instruction_pointer + 2, base_address, modes[1])
-            result = arg1 * arg2
-            write(memory, instruction_pointer + 3, base_address, modes[2], result)
-            instruction_pointer += 4
-        elif opcode == OPCODE.INPUT:
-            result, input_index = inputs[input_index], input_index + 1
-            write(memory, instruction_pointer + 1, base_address, modes[0], result)
-            instruction_pointer += 2
-        elif opcode == OPCODE.OUTPUT:
-            result = read(memory, instruction_pointer + 1, base_address, modes[0])
-            outputs.append(result)
-            instruction_pointer += 2
-        elif opcode == OPCODE.JUMP_IF_TRUE:
-            arg1 = read(memory, instruction_pointer + 1, base_address, modes[0])
-            arg2 = read(memory, instruction_pointer + 2, base_address, modes[1])
-            instruction_pointer = arg2 if arg1 != 0 else instruction_pointer + 3
-        elif opcode == OPCODE.JUMP_IF_FALSE:
-            arg1 = read(memory, instruction_pointer + 1, base_address, modes[0])
-            arg2 = read(memory, instruction_pointer + 2, base_address, modes[1])
-            instruction_pointer = arg2 if arg1 == 0 else instruction_pointer + 3
-        elif opcode == OPCODE.LESS_THAN:
-            arg1 = read(memory, instruction_pointer + 1, base_address, modes[0])
-            arg2 = read(memory, instruction_pointer + 2, base_address, modes[1])
-            result = 1 if arg1 < arg2 else 0
-            write(memory, instruction_pointer + 3, base_address, modes[2], result)
-            instruction_pointer += 4
-        elif opcode == OPCODE.EQUALS:
-            arg1 = read(memory, instruction_pointer + 1, base_address, modes[0])
-            arg2 = read(memory, instruction_pointer + 2, base_address, modes[1])
-            result = 1 if arg1 == arg2 else 0
-            write(memory, instruction_pointer + 3, base_address, modes[2], result)
-            instruction_pointer += 4
-        elif opcode == OPCODE.ADJUST:
-            base_address += read(memory, instruction_pointer + 1, base_address, modes[0])
-            instruction_pointer += 2
-        elif opcode == OPCODE.HALT:
-            break
-    return outputs
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from intcode import (  # noqa: E402 pylint: disable=wrong-import-position
+    CYCLE, HALTED, INSTRUCTION_BUDGET, CheckpointingCompiledIntCodeInterpreter, Checkpointer,
+    CompiledIntCodeInterpreter, CycleDetectingIntCodeInterpreter, FusingIntCodeInterpreter,
+    IntCodeInterpreter, read_program, resume_requested, supervise,
+)
+
+# with --resume the boost run continues from the last checkpoint written here
+CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'task2.checkpoint')
+CHECKPOINT_INTERVAL = 10 ** 5
+
+
+def execute(program, inputs=None, interpreter_class=CompiledIntCodeInterpreter):
+    interpreter = interpreter_class(program, inputs=inputs)
+    interpreter.execute()
+    return interpreter.outputs
 
 
 def test_task1():
     assert execute('109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99') == [int(number) for number in '109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99'.split(',')]
     assert len(str(execute('1102,34915192,34915192,7,4,7,99,0')[0])) == 16
     assert execute('104,1125899906842624,99')[0] == 1125899906842624
+    # negative addresses are an error for every interpreter, not a read from the end of the image
+    for program in ('4,-1,99', '1,-1,0,5,99,0', '109,-5,204,2,99', '1007,-1,3,7,1005,7,9,99,0,99'):
+        for interpreter_class in (
+                IntCodeInterpreter, FusingIntCodeInterpreter, CompiledIntCodeInterpreter,
+        ):
+            try:
+                execute(program, interpreter_class=interpreter_class)
+            except ValueError:
+                continue
+            assert False, f'{interpreter_class.__name__} read a negative address in {program}'
     print('tests for task 1: ok')
 
 
 def solve_task1():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
+    program = read_program()
     output = execute(program, inputs=[1])[0]
     print(f'answer to task 1: {output}')
 
 
 def test_task2():
+    # a jump to itself repeats its state, a counter never does and runs into the budget instead
+    status = supervise(CycleDetectingIntCodeInterpreter('1105,1,0'), max_instructions=10 ** 4)
+    assert status.outcome == CYCLE and status.error.instruction_pointer == 0
+    status = supervise(
+        CycleDetectingIntCodeInterpreter('101,1,8,8,1105,1,0,99,0'), max_instructions=10 ** 4,
+    )
+    assert status.outcome == INSTRUCTION_BUDGET and status.instructions == 10 ** 4
+    status = supervise(CycleDetectingIntCodeInterpreter('1101,1,1,5,99,0'), max_instructions=10)
+    assert status.outcome == HALTED and status.instructions == 1
+    # the fusing interpreter has to agree on both boost modes of the puzzle input
+    program = read_program()
+    for mode in (1, 2):
+        assert execute(program, [mode], FusingIntCodeInterpreter) == \
+            execute(program, [mode], IntCodeInterpreter)
     print('tests for task 2: ok')
 
 
+def boost(program, checkpointer, resume=False):
+    resumed = checkpointer.load(
+        CheckpointingCompiledIntCodeInterpreter, checkpointer=checkpointer,
+    ) if resume else None
+    if resumed is not None:
+        interpreter, _ = resumed
+    else:
+        interpreter = CheckpointingCompiledIntCodeInterpreter(
+            program, inputs=[2], checkpointer=checkpointer,
+        )
+    interpreter.execute()
+    checkpointer.remove()
+    return interpreter.outputs
+
+
 def solve_task2():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
-    output = execute(program, inputs=[2])[0]
+    program = read_program()
+    checkpointer = Checkpointer(CHECKPOINT, program, interval=CHECKPOINT_INTERVAL)
+    output = boost(program, checkpointer, resume=resume_requested())[0]
     print(f'answer to task 2: {output}')
 
 
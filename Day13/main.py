@@ -1,105 +1,17 @@
 #!/usr/bin/env python3
 
 from collections import namedtuple
+import copy
 from enum import IntEnum
-import fileinput
-
-import more_itertools as mit
-
-
-class OPCODE(IntEnum):
-    ADD = 1
-    MULTIPLY = 2
-    INPUT = 3
-    OUTPUT = 4
-    JUMP_IF_TRUE = 5
-    JUMP_IF_FALSE = 6
-    LESS_THAN = 7
-    EQUALS = 8
-    ADJUST = 9
-    HALT = 99
-
-
-class MODE(IntEnum):
-    POSITION = 0
-    IMMEDIATE = 1
-    RELATIVE = 2
-
-
-class IntCodeInterpreter:
-    def __init__(self, program):
-        self.memory = [int(number) for number in program.split(',')] + [0 for _ in range(1000)]
-        self.instruction_pointer = 0
-        self.base_address = 0
-        self.outputs = []
-        self.inputs = []
-        self.input_index = 0
-
-    def read(self, address, mode):
-        mode = int(mode)
-        if mode == MODE.POSITION:
-            return self.memory[self.memory[address]]
-        elif mode == MODE.IMMEDIATE:
-            return self.memory[address]
-        elif mode == MODE.RELATIVE:
-            return self.memory[self.base_address + self.memory[address]]
-
-    def write(self, address, mode, result):
-        mode = int(mode)
-        if mode == MODE.POSITION:
-            self.memory[self.memory[address]] = result
-        elif mode == MODE.RELATIVE:
-            self.memory[self.base_address + self.memory[address]] = result
-
-    def execute(self):
-        while True:
-            opcode = self.memory[self.instruction_pointer] % 100
-            modes = list(reversed(str(self.memory[self.instruction_pointer] // 100).rjust(4, '0')))
-            if opcode == OPCODE.ADD:
-                arg1 = self.read(self.instruction_pointer + 1, modes[0])
-                arg2 = self.read(self.instruction_pointer + 2, modes[1])
-                result = arg1 + arg2
-                self.write(self.instruction_pointer + 3, modes[2], result)
-                self.instruction_pointer += 4
-            elif opcode == OPCODE.MULTIPLY:
-                arg1 = self.read(self.instruction_pointer + 1, modes[0])
-                arg2 = self.read(self.instruction_pointer + 2, modes[1])
-                result = arg1 * arg2
-                self.write(self.instruction_pointer + 3, modes[2], result)
-                self.instruction_pointer += 4
-            elif opcode == OPCODE.INPUT:
-                result, self.input_index = self.inputs[self.input_index], self.input_index + 1
-                self.write(self.instruction_pointer + 1, modes[0], result)
-                self.instruction_pointer += 2
-            elif opcode == OPCODE.OUTPUT:
-                result = self.read(self.instruction_pointer + 1, modes[0])
-                self.outputs.append(result)
-                self.instruction_pointer += 2
-            elif opcode == OPCODE.JUMP_IF_TRUE:
-                arg1 = self.read(self.instruction_pointer + 1, modes[0])
-                arg2 = self.read(self.instruction_pointer + 2, modes[1])
-                self.instruction_pointer = arg2 if arg1 != 0 else self.instruction_pointer + 3
-            elif opcode == OPCODE.JUMP_IF_FALSE:
-                arg1 = self.read(self.instruction_pointer + 1, modes[0])
-                arg2 = self.read(self.instruction_pointer + 2, modes[1])
-                self.instruction_pointer = arg2 if arg1 == 0 else self.instruction_pointer + 3
-            elif opcode == OPCODE.LESS_THAN:
-                arg1 = self.read(self.instruction_pointer + 1, modes[0])
-                arg2 = self.read(self.instruction_pointer + 2, modes[1])
-                result = 1 if arg1 < arg2 else 0
-                self.write(self.instruction_pointer + 3, modes[2], result)
-                self.instruction_pointer += 4
-            elif opcode == OPCODE.EQUALS:
-                arg1 = self.read(self.instruction_pointer + 1, modes[0])
-                arg2 = self.read(self.instruction_pointer + 2, modes[1])
-                result = 1 if arg1 == arg2 else 0
-                self.write(self.instruction_pointer + 3, modes[2], result)
-                self.instruction_pointer += 4
-            elif opcode == OPCODE.ADJUST:
-                self.base_address += self.read(self.instruction_pointer + 1, modes[0])
-                self.instruction_pointer += 2
-            elif opcode == OPCODE.HALT:
-                break
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from intcode import (  # noqa: E402 pylint: disable=wrong-import-position
+    Checkpointer, CompiledIntCodeInterpreter, TupleSink, read_program, resume_requested,
+)
 
 
 class TILE(IntEnum):
@@ -111,55 +23,218 @@ class TILE(IntEnum):
 
 
 Tile = namedtuple('Tile', field_names=['x', 'y', 'symbol'])
-
-
-def find_last_tile(outputs, predicate):
-    for symbol, x, y in mit.chunked(reversed(outputs), 3):
-        tile = Tile(x, y, symbol)
-        if predicate(tile):
-            return tile
+Game = namedtuple(
+    'Game', field_names=['score', 'frames', 'round_trips', 'mispredictions', 'seconds'],
+)
+SCORE = (-1, 0)
+# the longest flight of the ball which is predicted in one go
+MAX_FLIGHT = 1000
+# with --resume the game continues from the last checkpoint written here
+CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'task2.checkpoint')
+CHECKPOINT_INTERVAL = 10 ** 6
+
+
+class Screen:
+    def __init__(self):
+        self.tiles = {}
+        self.ball = self.paddle = None
+        self.score = 0
+        self.blocks = 0
+
+    def draw(self, x, y, value):
+        if (x, y) == SCORE:
+            self.score = value
+            return
+        previous = self.tiles.get((x, y), TILE.EMPTY)
+        self.blocks += (value == TILE.BLOCK) - (previous == TILE.BLOCK)
+        self.tiles[x, y] = value
+        if value == TILE.BALL:
+            self.ball = Tile(x, y, value)
+        elif value == TILE.PADDLE:
+            self.paddle = Tile(x, y, value)
+
+    def append(self, tile):
+        # the screen takes the (x, y, value) triples of a TupleSink
+        self.draw(*tile)
+
+    def copy(self):
+        screen = copy.copy(self)
+        screen.tiles = dict(self.tiles)
+        return screen
 
 
 def clamp(value, low, high):
     return max(low, min(value, high))
 
 
+def sign(value):
+    return clamp(value, -1, 1)
+
+
+def predict_flight(screen, velocity):
+    # returns the positions of the ball in the coming frames until it is back in the row above the
+    # paddle, bouncing off walls, blocks and the paddle where it is now and breaking blocks like
+    # the game does, empty when it is not going to get there
+    x, y, _ = screen.ball
+    dx, dy = velocity
+    row = screen.paddle.y - 1
+    broken = set()
+
+    def bounce(cell):
+        tile = screen.tiles.get(cell, TILE.EMPTY)
+        if tile == TILE.EMPTY or tile == TILE.BALL or cell in broken:
+            return False
+        if tile == TILE.BLOCK:
+            broken.add(cell)
+        return True
+
+    positions = []
+    while len(positions) < MAX_FLIGHT:
+        flip_x, flip_y = bounce((x + dx, y)), bounce((x, y + dy))
+        if not flip_x and not flip_y and bounce((x + dx, y + dy)):
+            flip_x = flip_y = True
+        dx, dy = -dx if flip_x else dx, -dy if flip_y else dy
+        x, y = x + dx, y + dy
+        positions.append((x, y))
+        if y >= row:
+            break
+    return positions if y == row else []
+
+
+def boot(interpreter):
+    # the machine runs as a generator handing out (x, y, tile) triples, and None whenever it
+    # waits for the joystick
+    interpreter.outputs = TupleSink(3)
+    return interpreter.run()
+
+
+def run_frames(interpreter, machine, screen, joysticks):
+    # plays a frame per joystick position, returns whether the game waits for the next one. The
+    # first position is sent to the waiting machine, the others are queued behind it, without
+    # any a booted machine just runs up to its first wait.
+    interpreter.inputs.extend(joysticks[1:])
+    try:
+        tile = machine.send(joysticks[0]) if joysticks else next(machine)
+        while tile is not None:
+            screen.draw(*tile)
+            tile = next(machine)
+    except StopIteration:
+        return False
+    return True
+
+
+def play(program, autopilot=True, checkpointer=None, resume=False):
+    """Plays the game, following the ball frame by frame or, with the autopilot, moving the paddle
+    to where the ball lands next for a whole flight of the ball at once.
+
+    A flight is only predicted from the walls and blocks on the screen. When the ball is not where
+    it was predicted to be afterwards, the flight is played again frame by frame.
+    With a checkpointer the game is saved between frames, resume continues from there.
+    """
+    start = time.perf_counter()
+    resumed = checkpointer.load(CompiledIntCodeInterpreter) if resume else None
+    if resumed is not None:
+        # checkpoints are only taken while the game waits for the joystick
+        interpreter, (screen, frames, round_trips, mispredictions) = resumed
+    else:
+        interpreter = CompiledIntCodeInterpreter(program)
+        interpreter.write(0, 2)
+        screen = Screen()
+        frames = round_trips = mispredictions = 0
+    machine = boot(interpreter)
+    waiting = run_frames(interpreter, machine, screen, [])
+    velocity, predict = None, autopilot
+    while waiting:
+        if checkpointer is not None and checkpointer.due(interpreter):
+            checkpointer.save(interpreter, (screen, frames, round_trips, mispredictions))
+        ball, paddle = screen.ball, screen.paddle
+        flight = predict_flight(screen, velocity) if predict and velocity else []
+        if flight:
+            target, x, joysticks = flight[-1][0], paddle.x, []
+            if ball.y == paddle.y - 1:
+                # the paddle stays where it is while the ball bounces off it
+                joysticks.append(0)
+            while len(joysticks) < len(flight):
+                joysticks.append(sign(target - x))
+                x += joysticks[-1]
+            # the forked machine shares the compiled code, unlike one restored from a snapshot
+            backup, previous = interpreter.fork(), screen.copy()
+            waiting = run_frames(interpreter, machine, screen, joysticks)
+            round_trips += 1
+            cleared = not waiting and not screen.blocks
+            if cleared or waiting and (screen.ball.x, screen.ball.y) == flight[-1]:
+                frames += len(flight)
+                last = flight[-2] if len(flight) > 1 else (ball.x, ball.y)
+                velocity = (flight[-1][0] - last[0], flight[-1][1] - last[1])
+                continue
+            # the backup waits for the joystick again as soon as it is booted
+            interpreter, screen, predict = backup, previous, False
+            machine = boot(interpreter)
+            waiting = run_frames(interpreter, machine, screen, [])
+            mispredictions += 1
+            continue
+        waiting = run_frames(interpreter, machine, screen, [sign(ball.x - paddle.x)])
+        frames, round_trips = frames + 1, round_trips + 1
+        velocity = (screen.ball.x - ball.x, screen.ball.y - ball.y)
+        if screen.ball.y == paddle.y - 1:
+            predict = autopilot
+    if checkpointer is not None:
+        checkpointer.remove()
+    return Game(screen.score, frames, round_trips, mispredictions, time.perf_counter() - start)
+
+
 def test_task1():
+    screen = Screen()
+    for x, y, value in [(1, 2, 3), (6, 5, 4), (2, 2, 2), (3, 2, 2), (2, 2, 0), (-1, 0, 12)]:
+        screen.draw(x, y, value)
+    assert screen.blocks == 1
+    assert screen.ball == Tile(6, 5, TILE.BALL)
+    assert screen.paddle == Tile(1, 2, TILE.PADDLE)
+    assert screen.score == 12
+    sink = TupleSink(3, screen)
+    for value in [7, 8, TILE.BLOCK, 7, 8]:
+        sink.append(value)
+    assert screen.blocks == 2
+    assert sink.pending == [7, 8]
     print('tests for task 1: ok')
 
 
 def solve_task1():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
-    interpreter = IntCodeInterpreter(program)
-    interpreter.execute()
-    num_blocks = sum(
-        True if index % 3 == 2 and output == TILE.BLOCK else False
-        for index, output in enumerate(interpreter.outputs)
-    )
-    print(f'answer to task 1: {num_blocks}')
+    program = read_program()
+    interpreter = CompiledIntCodeInterpreter(program)
+    screen = Screen()
+    run_frames(interpreter, boot(interpreter), screen, [])
+    print(f'answer to task 1: {screen.blocks}')
 
 
 def test_task2():
+    screen = Screen()
+    screen.draw(4, 3, TILE.BLOCK)
+    screen.draw(4, 3, TILE.BALL)
+    screen.draw(4, 3, TILE.EMPTY)
+    assert screen.blocks == 0
+    # a box of walls with a block in the top left corner, the ball flies up and right
+    screen = Screen()
+    for x in range(6):
+        screen.draw(x, 0, TILE.WALL)
+    for y in range(6):
+        screen.draw(0, y, TILE.WALL)
+        screen.draw(5, y, TILE.WALL)
+    screen.draw(1, 1, TILE.BLOCK)
+    screen.draw(2, 4, TILE.BALL)
+    screen.draw(2, 5, TILE.PADDLE)
+    assert predict_flight(screen, (1, -1)) == [(3, 3), (4, 2), (3, 1), (2, 2), (1, 3), (2, 4)]
+    assert predict_flight(screen, (-1, -1)) == [(1, 3), (2, 2), (3, 1), (4, 2), (3, 3), (2, 4)]
     print('tests for task 2: ok')
 
 
 def solve_task2():
-    program = [line.rstrip('\n') for line in fileinput.input()][0]
-    interpreter = IntCodeInterpreter(program)
-    interpreter.memory[0] = 2
-    while True:
-        try:
-            interpreter.execute()
-        except IndexError:
-            ball = find_last_tile(interpreter.outputs, lambda tile: tile.symbol == TILE.BALL)
-            paddle = find_last_tile(interpreter.outputs, lambda tile: tile.symbol == TILE.PADDLE)
-            paddle_direction = clamp(ball.y - paddle.y, -1, 1)
-            interpreter.inputs.append(paddle_direction)
-        else:
-            break
-
-    tile = find_last_tile(interpreter.outputs, lambda tile: tile.x == 0 and tile.y == -1)
-    final_score = tile.symbol
+    program = read_program()
+    checkpointer = Checkpointer(CHECKPOINT, program, interval=CHECKPOINT_INTERVAL)
+    # the autopilot saves round trips, but not time, see benchmarks/breakout.py
+    final_score = play(
+        program, autopilot=False, checkpointer=checkpointer, resume=resume_requested(),
+    ).score
     print(f'answer to task 2: {final_score}')
 
 
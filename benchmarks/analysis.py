@@ -0,0 +1,57 @@
+# usage: python3 -m benchmarks.analysis
+
+import os
+import shutil
+import tempfile
+import time
+
+from intcode import IntCodeInterpreter, analyze, load_analysis, parse_program, predecode
+
+from .common import ROOT, load_program
+
+
+def coverage(program, analysis, inputs):
+    # the share of the instructions executed on a run which the analysis found
+    interpreter = IntCodeInterpreter(program, inputs=inputs)
+    try:
+        interpreter.execute()
+    except IndexError:
+        pass
+    executed = set(interpreter._decoded)  # pylint: disable=protected-access
+    return len(executed & set(analysis.instructions)) / len(executed)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for day, inputs in ((5, [5]), (7, [5, 0]), (9, [2]), (11, [0] * 10000), (13, [])):
+            text = load_program(day)
+            program = parse_program(text)
+            path = os.path.join(directory, f'day{day:02d}')
+            shutil.copy(os.path.join(ROOT, f'Day{day:02d}', 'input'), path)
+
+            start = time.perf_counter()
+            analysis = load_analysis(path)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            load_analysis(path)
+            cached = time.perf_counter() - start
+
+            interpreter = IntCodeInterpreter(program)
+            decoded = predecode(interpreter, analysis)
+            assert analyze(text).instructions == analysis.instructions
+            print(f'Day{day:02d}: {analysis.summary()}')
+            print(f'       analysis {cold * 1000:.1f} ms, cached {cached * 1000:.1f} ms, '
+                  f'{decoded} instructions predecoded, '
+                  f'{coverage(program, analysis, inputs):.0%} of the executed ones found')
+            if analysis.self_modifying:
+                # where the program rewrites its code, which the exploration does not follow
+                print('       writes to code: ' + ', '.join(
+                    f'{ip} -> {address}' for ip, address in sorted(analysis.self_modifying.items())
+                ))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
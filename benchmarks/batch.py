@@ -0,0 +1,85 @@
+# usage: python3 -m benchmarks.batch
+
+import itertools
+import time
+
+from intcode import BatchIntCodeInterpreter, IntCodeInterpreter, parse_program
+
+from .common import load_program
+
+
+def noun_verb_single(numbers, pairs):
+    count, results = 0, []
+    for noun, verb in pairs:
+        interpreter = IntCodeInterpreter(numbers)
+        interpreter.write(1, noun)
+        interpreter.write(2, verb)
+        interpreter.execute()
+        count += interpreter.instruction_count
+        results.append(interpreter.read(0))
+    return results, count
+
+
+def noun_verb_batch(numbers, pairs):
+    batch = BatchIntCodeInterpreter(numbers, lanes=len(pairs))
+    batch.write(1, [noun for noun, _ in pairs])
+    batch.write(2, [verb for _, verb in pairs])
+    batch.execute()
+    return batch.read(0), batch.instruction_count
+
+
+def amplifiers_single(numbers, permutations):
+    count, signals = 0, []
+    for phases in permutations:
+        signal = 0
+        for phase in phases:
+            interpreter = IntCodeInterpreter(numbers, inputs=[phase, signal])
+            interpreter.execute()
+            count += interpreter.instruction_count
+            signal = interpreter.outputs[0]
+        signals.append(signal)
+    return signals, count
+
+
+def amplifiers_batch(numbers, permutations):
+    # one batch per amplifier, its lanes are the permutations
+    count, signals = 0, [0] * len(permutations)
+    for stage in range(len(permutations[0])):
+        batch = BatchIntCodeInterpreter(numbers, inputs=[
+            [phases[stage], signal] for phases, signal in zip(permutations, signals)
+        ])
+        batch.execute()
+        count += batch.instruction_count
+        signals = [outputs[0] for outputs in batch.outputs]
+    return signals, count
+
+
+def measure(function, numbers, parameters):
+    start = time.perf_counter()
+    results, count = function(numbers, parameters)
+    return results, count, time.perf_counter() - start
+
+
+def main():
+    day02, day07 = parse_program(load_program(2)), parse_program(load_program(7))
+    grid = list(itertools.product(range(100), range(100)))
+    print(f'{"workload":<24} {"machines":>8} {"single":>18} {"batched":>18} {"speedup":>8}')
+    for name, single, batched, numbers, parameters in [
+            ('Day02 noun/verb', noun_verb_single, noun_verb_batch, day02, grid[:10]),
+            ('Day02 noun/verb', noun_verb_single, noun_verb_batch, day02, grid[:100]),
+            ('Day02 noun/verb', noun_verb_single, noun_verb_batch, day02, grid[:1000]),
+            ('Day02 noun/verb', noun_verb_single, noun_verb_batch, day02, grid),
+            ('Day07 amplifiers', amplifiers_single, amplifiers_batch, day07,
+             list(itertools.permutations(range(5)))),
+    ]:
+        expected, count, single_time = measure(single, numbers, parameters)
+        results, batch_count, batch_time = measure(batched, numbers, parameters)
+        assert results == expected and batch_count == count
+        print(
+            f'{name:<24} {len(parameters):>8} {count / single_time:12,.0f} ins/s'
+            f' {count / batch_time:12,.0f} ins/s {single_time / batch_time:7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
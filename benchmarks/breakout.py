@@ -0,0 +1,22 @@
+# usage: python3 -m benchmarks.breakout
+
+from intcode import parse_program
+
+from .common import load_day, load_program
+
+
+def main():
+    day = load_day(13)
+    program = parse_program(load_program(13))
+    print(f'{"driver":<12} {"score":>6} {"frames":>7} {"round trips":>11} {"mispredicted":>12}'
+          f' {"time":>10} {"frames/s":>10}')
+    for name, autopilot in (('per frame', False), ('autopilot', True)):
+        game = min((day.play(program, autopilot=autopilot) for _ in range(3)),
+                   key=lambda game: game.seconds)
+        print(f'{name:<12} {game.score:>6} {game.frames:>7} {game.round_trips:>11}'
+              f' {game.mispredictions:>12} {game.seconds * 1000:7.1f} ms'
+              f' {game.frames / game.seconds:10,.0f}')
+
+
+if __name__ == '__main__':
+    main()
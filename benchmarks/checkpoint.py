@@ -0,0 +1,41 @@
+# usage: python3 -m benchmarks.checkpoint
+
+import os
+import tempfile
+
+from intcode import (
+    CheckpointingCompiledIntCodeInterpreter, Checkpointer, CompiledIntCodeInterpreter,
+)
+
+from .common import best_time, load_program, report
+
+
+def main():
+    program = load_program(9)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'boost.checkpoint')
+
+        def plain():
+            interpreter = CompiledIntCodeInterpreter(program, inputs=[2])
+            interpreter.execute()
+            assert interpreter.outputs == [46643]
+            return interpreter.instruction_count
+        instructions = plain()
+        report('Day09 plain', best_time(plain), instructions)
+
+        for interval in (10 ** 3, 10 ** 4, 10 ** 5):
+            checkpointer = Checkpointer(path, program, interval=interval)
+
+            def checkpointed(checkpointer=checkpointer):
+                checkpointer.saved = checkpointer.saves = 0
+                interpreter = CheckpointingCompiledIntCodeInterpreter(
+                    program, inputs=[2], checkpointer=checkpointer,
+                )
+                interpreter.execute()
+                assert interpreter.outputs == [46643]
+            report(f'Day09 every {interval:,}', best_time(checkpointed), instructions)
+            print(f'{"":<24} {checkpointer.saves} checkpoints of {os.path.getsize(path)} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import importlib.util
+import os
+import time
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def load_program(day):
+    with open(os.path.join(ROOT, f'Day{day:02d}', 'input')) as file:
+        return file.readline().rstrip('\n')
+
+
+def best_time(function, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(name, seconds, instructions):
+    print(f'{name:<24} {seconds * 1000:10.1f} ms {instructions / seconds:14,.0f} instructions/s')
+
+
+def load_day(day):
+    # imports the main.py of a day as a module, without running it
+    path = os.path.join(ROOT, f'Day{day:02d}', 'main.py')
+    spec = importlib.util.spec_from_file_location(f'day{day:02d}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,68 @@
+# usage: python3 -m benchmarks.compiler
+
+from intcode import CompiledIntCodeInterpreter, IntCodeInterpreter
+
+from .common import best_time, load_program
+from .legacy import IntCodeInterpreter as LegacyIntCodeInterpreter
+
+
+INTERPRETERS = [
+    ('legacy execute', LegacyIntCodeInterpreter),
+    ('pre-decoded execute', IntCodeInterpreter),
+    ('compiled blocks', CompiledIntCodeInterpreter),
+]
+
+
+def boost(interpreter_class, program):
+    interpreter = interpreter_class(program)
+    interpreter.inputs.append(2)
+    interpreter.execute()
+    return interpreter.outputs
+
+
+def breakout(interpreter_class, program):
+    # plays the game with the paddle following the ball, only looking at the new outputs
+    interpreter = interpreter_class(program)
+    interpreter.memory[0] = 2
+    ball = paddle = score = seen = 0
+    while True:
+        try:
+            interpreter.execute()
+        except IndexError:
+            halted = False
+        else:
+            halted = True
+        outputs = interpreter.outputs
+        for index in range(seen, len(outputs), 3):
+            x, y, tile = outputs[index:index + 3]
+            if (x, y) == (-1, 0):
+                score = tile
+            elif tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+        seen = len(outputs)
+        if halted:
+            return score
+        interpreter.inputs.append((ball > paddle) - (ball < paddle))
+
+
+def main():
+    for name, workload, program in [
+            ('Day09 BOOST part 2', boost, load_program(9)),
+            ('Day13 breakout game', breakout, load_program(13)),
+    ]:
+        print(name)
+        expected = workload(LegacyIntCodeInterpreter, program)
+        baseline = None
+        for label, interpreter_class in INTERPRETERS:
+            assert workload(interpreter_class, program) == expected
+            seconds = best_time(
+                lambda interpreter_class=interpreter_class: workload(interpreter_class, program),
+            )
+            baseline = baseline or seconds
+            print(f'{label:<24} {seconds * 1000:10.1f} ms {baseline / seconds:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
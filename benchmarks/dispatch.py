@@ -0,0 +1,32 @@
+# usage: python3 -m benchmarks.dispatch
+
+from intcode import IntCodeInterpreter
+
+from .common import best_time, load_program, report
+from .legacy import IntCodeInterpreter as LegacyIntCodeInterpreter
+
+
+def run(interpreter_class, program, inputs):
+    interpreter = interpreter_class(program)
+    interpreter.inputs.extend(inputs)
+    interpreter.execute()
+    return interpreter
+
+
+def main():
+    program = load_program(9)
+    for inputs in ([1], [2]):
+        legacy = run(LegacyIntCodeInterpreter, program, inputs)
+        interpreter = run(IntCodeInterpreter, program, inputs)
+        assert legacy.outputs == interpreter.outputs
+        instructions = interpreter.instruction_count
+
+        print(f'Day09 BOOST, input {inputs[0]}: {instructions:,} instructions')
+        seconds = best_time(lambda: run(LegacyIntCodeInterpreter, program, inputs))
+        report('legacy execute', seconds, instructions)
+        seconds = best_time(lambda: run(IntCodeInterpreter, program, inputs))
+        report('pre-decoded execute', seconds, instructions)
+
+
+if __name__ == '__main__':
+    main()
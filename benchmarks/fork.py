@@ -0,0 +1,72 @@
+# usage: python3 -m benchmarks.fork
+
+import gc
+import time
+import tracemalloc
+
+from intcode import CompiledIntCodeInterpreter
+
+from .common import load_program
+
+
+def play(interpreter, frames):
+    # advances the game by the given number of joystick inputs, the paddle follows the ball
+    ball = paddle = 0
+    for _ in range(frames):
+        try:
+            interpreter.execute()
+        except IndexError:
+            pass
+        else:
+            raise RuntimeError('game over')
+        outputs = interpreter.outputs
+        for index in range(0, len(outputs), 3):
+            x, _, tile = outputs[index:index + 3]
+            if tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+        outputs.clear()
+        interpreter.inputs.append((ball > paddle) - (ball < paddle))
+
+
+def main():
+    program = load_program(13)
+    interpreter = CompiledIntCodeInterpreter(program)
+    interpreter.write(0, 2)
+    branches = 1000
+    played = 0
+    print(
+        f'{"frame":>6} {"fork":>9} {"run 1 frame":>12} {"memory/branch":>14}'
+        f' {"private pages":>14}'
+    )
+    for frame in (1, 100, 1000, 5000):
+        play(interpreter, frame - played)
+        played = frame
+
+        gc.collect()
+        start = time.perf_counter()
+        forks = [interpreter.fork() for _ in range(branches)]
+        fork_time = (time.perf_counter() - start) / branches
+
+        start = time.perf_counter()
+        for fork in forks:
+            play(fork, 1)
+        run_time = (time.perf_counter() - start) / branches
+
+        # memory is traced separately on fresh forks, tracing slows down every allocation
+        forks = [interpreter.fork() for _ in range(branches)]
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for fork in forks:
+            play(fork, 1)
+        per_branch = (tracemalloc.get_traced_memory()[0] - before) / branches
+        tracemalloc.stop()
+        print(
+            f'{frame:>6} {fork_time * 1e6:>6.1f} us {run_time * 1e6:>9.1f} us '
+            f'{per_branch / 1024:>11.1f} kB {forks[0].memory.private_pages:>14}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# usage: python3 -m benchmarks.fusion
+
+import time
+
+from intcode import FusingIntCodeInterpreter, IntCodeInterpreter
+
+from .common import load_program
+
+
+def boost(interpreter_class):
+    interpreter = interpreter_class(load_program(9), inputs=[2])
+    interpreter.execute()
+    return interpreter, interpreter.outputs
+
+
+def breakout(interpreter_class):
+    interpreter = interpreter_class(load_program(13))
+    interpreter.write(0, 2)
+    machine = interpreter.run()
+    ball = paddle = score = 0
+    try:
+        value = next(machine)
+        while True:
+            if value is None:
+                value = machine.send((ball > paddle) - (ball < paddle))
+                continue
+            x, y, tile = value, next(machine), next(machine)
+            if (x, y) == (-1, 0):
+                score = tile
+            elif tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+            value = next(machine)
+    except StopIteration:
+        pass
+    return interpreter, score
+
+
+def main():
+    print(f'{"program":<8} {"interpreter":<11} {"time":>10} {"instructions":>12}'
+          f' {"dispatches":>10} {"dispatches/s":>12}  fusions')
+    for name, run in (('Day09', boost), ('Day13', breakout)):
+        results = []
+        for label, interpreter_class in (('plain', IntCodeInterpreter),
+                                         ('fusing', FusingIntCodeInterpreter)):
+            start = time.perf_counter()
+            interpreter, result = run(interpreter_class)
+            seconds = time.perf_counter() - start
+            results.append(result)
+            dispatches = getattr(interpreter, 'dispatches', interpreter.instruction_count)
+            fusions = ', '.join(
+                f'{kind} {count}' for kind, count in getattr(interpreter, 'fusions', {}).items()
+            )
+            print(f'{name:<8} {label:<11} {seconds * 1000:7.1f} ms'
+                  f' {interpreter.instruction_count:>12,} {dispatches:>10,}'
+                  f' {dispatches / seconds:>12,.0f}  {fusions}')
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# usage: python3 -m benchmarks.hotspots [directory for the JSON profiles]
+
+import os
+import sys
+
+from intcode import ProfilingIntCodeInterpreter
+
+from .common import load_program
+
+
+def boost():
+    interpreter = ProfilingIntCodeInterpreter(load_program(9), inputs=[2])
+    interpreter.execute()
+    return interpreter
+
+
+def breakout():
+    interpreter = ProfilingIntCodeInterpreter(load_program(13))
+    interpreter.write(0, 2)
+    machine = interpreter.run()
+    ball = paddle = 0
+    try:
+        value = next(machine)
+        while True:
+            if value is None:
+                value = machine.send((ball > paddle) - (ball < paddle))
+                continue
+            x, _, tile = value, next(machine), next(machine)
+            if tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+            value = next(machine)
+    except StopIteration:
+        pass
+    return interpreter
+
+
+def describe(interpreter, ip):
+    instruction = interpreter.decode(ip)
+    cells = interpreter.memory.cells(ip, ip + 1 + len(instruction.modes))
+    modes = ' '.join(mode.name.lower() for mode in instruction.modes)
+    return f'{ip:>6}: {instruction.opcode.name:<14} {modes:<30} {cells}'
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    for name, workload in [('day09-boost', boost), ('day13-breakout', breakout)]:
+        interpreter = workload()
+        profile = interpreter.profile
+        print(name)
+        print(profile.report())
+        print('hottest instructions:')
+        for address, count in profile.hot_addresses(10):
+            print(f'{count:>10,} {describe(interpreter, address)}')
+        print()
+        if directory is not None:
+            with open(os.path.join(directory, f'{name}.json'), 'w') as file:
+                file.write(profile.to_json(indent=2))
+
+
+if __name__ == '__main__':
+    main()
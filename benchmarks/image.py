@@ -0,0 +1,61 @@
+# usage: python3 -m benchmarks.image
+
+import os
+import random
+import tempfile
+
+from intcode import ProgramImage, load_program, parse_program
+
+from .common import ROOT, best_time
+
+
+def large_program(cells):
+    # random cells with a few ints too big for int64 in between
+    numbers = [random.randint(-10 ** 6, 10 ** 6) for _ in range(cells)]
+    for index in range(0, cells, cells // 10):
+        numbers[index] = random.choice((-1, 1)) * random.randint(1 << 63, 1 << 80)
+    return ','.join(str(number) for number in numbers)
+
+
+def main():
+    random.seed(2019)
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = [
+            (f'Day{day:02d}', os.path.join(ROOT, f'Day{day:02d}', 'input')) for day in (9, 13)
+        ]
+        for cells in (100000, 1000000):
+            path = os.path.join(directory, f'large-{cells}')
+            with open(path, 'w') as file:
+                file.write(large_program(cells))
+            inputs.append((f'{cells:,} cells', path))
+
+        print(
+            f'{"program":<16} {"parse text":>12} {"first load":>12} {"cached load":>12}'
+            f' {"mmap only":>12}'
+        )
+        for name, path in inputs:
+            with open(path) as file:
+                text = file.read()
+            parse = best_time(
+                lambda: parse_program(text.strip()),  # pylint: disable=cell-var-from-loop
+            )
+            if os.path.exists(f'{path}.intcode'):
+                os.remove(f'{path}.intcode')
+            first = best_time(
+                lambda: load_program(path), repeat=1,  # pylint: disable=cell-var-from-loop
+            )
+            cached = best_time(lambda: load_program(path))  # pylint: disable=cell-var-from-loop
+            assert load_program(path) == parse_program(text.strip())
+
+            def mmap_only():
+                with ProgramImage(f'{path}.intcode') as image:  # pylint: disable=cell-var-from-loop
+                    return len(image.cells)
+            mapped = best_time(mmap_only)
+            print(
+                f'{name:<16} {parse * 1e6:9.0f} us {first * 1e6:9.0f} us {cached * 1e6:9.0f} us'
+                f' {mapped * 1e6:9.0f} us'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# usage: python3 -m benchmarks.io
+
+from intcode import CompiledIntCodeInterpreter
+
+from .common import best_time, load_program
+
+
+# reads a value, writes it back and starts over, so nearly all of its time is spent on I/O
+ECHO = '3,100,4,100,1105,1,0'
+ECHOES = 100000
+
+
+def echo_exceptions(program):
+    interpreter = CompiledIntCodeInterpreter(program)
+    total = 0
+    for value in range(ECHOES):
+        interpreter.inputs.append(value)
+        try:
+            interpreter.execute()
+        except IndexError:
+            total += interpreter.outputs.pop()
+    return total, 2 * ECHOES
+
+
+def echo_generator(program):
+    machine = CompiledIntCodeInterpreter(program).run()
+    next(machine)
+    total = 0
+    for value in range(ECHOES):
+        total += machine.send(value)
+        next(machine)
+    return total, 2 * ECHOES
+
+
+def turned(direction, turn):
+    return (-direction[1], direction[0]) if turn == 0 else (direction[1], -direction[0])
+
+
+def robot_exceptions(program):
+    # the Day11 hull painting robot, without numpy
+    interpreter = CompiledIntCodeInterpreter(program)
+    position, direction, painted = (0, 0), (0, 1), {}
+    interpreter.inputs.append(0)
+    while True:
+        try:
+            interpreter.execute()
+        except IndexError:
+            colour, turn = interpreter.outputs[-2], interpreter.outputs[-1]
+            painted[position] = colour
+            direction = turned(direction, turn)
+            position = (position[0] + direction[0], position[1] + direction[1])
+            interpreter.inputs.append(painted.get(position, 0))
+        else:
+            break
+    return len(painted), len(interpreter.inputs) + len(interpreter.outputs)
+
+
+def robot_generator(program):
+    machine = CompiledIntCodeInterpreter(program).run()
+    position, direction, painted = (0, 0), (0, 1), {}
+    events = 0
+    try:
+        next(machine)
+        while True:
+            colour = machine.send(painted.get(position, 0))
+            turn = next(machine)
+            events += 3
+            painted[position] = colour
+            direction = turned(direction, turn)
+            position = (position[0] + direction[0], position[1] + direction[1])
+            next(machine)
+    except StopIteration:
+        pass
+    return len(painted), events
+
+
+def breakout_exceptions(program):
+    # the Day13 game with the paddle following the ball, only looking at the new outputs
+    interpreter = CompiledIntCodeInterpreter(program)
+    interpreter.write(0, 2)
+    ball = paddle = score = seen = 0
+    while True:
+        try:
+            interpreter.execute()
+        except IndexError:
+            halted = False
+        else:
+            halted = True
+        outputs = interpreter.outputs
+        for index in range(seen, len(outputs), 3):
+            x, y, tile = outputs[index:index + 3]
+            if (x, y) == (-1, 0):
+                score = tile
+            elif tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+        seen = len(outputs)
+        if halted:
+            return score, len(interpreter.inputs) + len(outputs)
+        interpreter.inputs.append((ball > paddle) - (ball < paddle))
+
+
+def breakout_generator(program):
+    interpreter = CompiledIntCodeInterpreter(program)
+    interpreter.write(0, 2)
+    machine = interpreter.run()
+    ball = paddle = score = events = 0
+    try:
+        value = next(machine)
+        while True:
+            events += 1
+            if value is None:
+                value = machine.send((ball > paddle) - (ball < paddle))
+                continue
+            x, y, tile = value, next(machine), next(machine)
+            events += 2
+            if (x, y) == (-1, 0):
+                score = tile
+            elif tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+            value = next(machine)
+    except StopIteration:
+        pass
+    return score, events
+
+
+def main():
+    for name, program, workloads in [
+            ('echo loop', ECHO, (echo_exceptions, echo_generator)),
+            ('Day11 painting robot', load_program(11), (robot_exceptions, robot_generator)),
+            ('Day13 breakout game', load_program(13), (breakout_exceptions, breakout_generator)),
+    ]:
+        print(name)
+        expected = None
+        for label, workload in zip(('IndexError loop', 'generator'), workloads):
+            result, events = workload(program)
+            assert expected is None or result == expected
+            expected = result
+            seconds = best_time(lambda: workload(program))  # pylint: disable=cell-var-from-loop
+            print(f'{label:<24} {seconds * 1000:10.1f} ms {seconds / events * 1e6:8.2f} us/I/O')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# usage: python3 -m benchmarks.memory
+
+import resource
+import time
+
+from intcode import IntCodeInterpreter
+
+from .legacy import IntCodeInterpreter as LegacyIntCodeInterpreter
+
+
+OFFSET = 100
+
+
+def scatter_program(count, stride):
+    # writes a 1 every stride addresses behind the code, count times, using the relative base as
+    # the pointer
+    return ','.join(str(number) for number in [
+        109, stride,
+        21101, 1, 0, OFFSET,
+        1001, 14, -1, 14,
+        1005, 14, 0,
+        99,
+        count,
+    ])
+
+
+def legacy_outcome(program):
+    try:
+        LegacyIntCodeInterpreter(program).execute()
+    except IndexError:
+        return 'IndexError'
+    return 'ok'
+
+
+def main():
+    count = 1000
+    print(
+        f'{"stride":>13} {"highest address":>18} {"pages":>6} {"time":>9} {"max rss":>10}'
+        '  legacy'
+    )
+    for stride in (1, 100, 10_000, 1_000_000, 1_000_000_000):
+        program = scatter_program(count, stride)
+        interpreter = IntCodeInterpreter(program)
+        start = time.perf_counter()
+        interpreter.execute()
+        seconds = time.perf_counter() - start
+        assert interpreter.read(OFFSET + count * stride) == 1
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(
+            f'{stride:>13,} {OFFSET + count * stride:>18,} {interpreter.memory.resident_pages:>6} '
+            f'{seconds * 1000:>6.1f} ms {max_rss:>7,} kB  {legacy_outcome(program)}'
+        )
+
+
+if __name__ == '__main__':
+    main()
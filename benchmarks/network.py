@@ -0,0 +1,66 @@
+# usage: python3 -m benchmarks.network
+
+from intcode import IntCodeInterpreter, Network, chain
+
+from .common import best_time
+
+
+def feedback_program(rounds):
+    # reads a value, outputs it incremented by one and repeats for the given number of rounds
+    program = [3, 100, 1001, 100, 1, 100, 4, 100, 1001, 101, -1, 101, 1005, 101, 0, 99]
+    program += [0] * (100 - len(program)) + [0, rounds]
+    return program
+
+
+def restart(program, count):
+    # the former Day07 approach: every machine is rerun from the start with its full input history
+    inputs = [[0]] + [[] for _ in range(count - 1)]
+    outputs = []
+    while True:
+        for index in range(count):
+            interpreter = IntCodeInterpreter(program, inputs=inputs[index] + outputs)
+            try:
+                interpreter.execute()
+            except IndexError:
+                waiting = True
+            else:
+                waiting = False
+            outputs = interpreter.outputs
+        if not waiting:
+            return outputs[-1]
+
+
+def resume(program, count):
+    network = Network(
+        [IntCodeInterpreter(program) for _ in range(count)], chain(count, feedback=True),
+    )
+    network.send(0, 0)
+    assert network.run()
+    return network.outputs[-1][-1]
+
+
+def main():
+    print(
+        f'{"machines":>8} {"rounds":>7} {"restart":>12} {"resume":>12}'
+        f' {"per machine and round":>22}'
+    )
+    for count, rounds in [(5, 10), (5, 100), (5, 1000), (5, 10000), (50, 100), (500, 100)]:
+        program = feedback_program(rounds)
+        assert resume(program, count) == count * rounds
+        resumed = best_time(lambda: resume(program, count))  # pylint: disable=cell-var-from-loop
+        if rounds * count <= 5000:
+            assert restart(program, count) == count * rounds
+            seconds = best_time(
+                lambda: restart(program, count), repeat=1,  # pylint: disable=cell-var-from-loop
+            )
+            restarted = f'{seconds * 1000:9.1f} ms'
+        else:
+            restarted = 'skipped'
+        print(
+            f'{count:>8} {rounds:>7} {restarted:>12} {resumed * 1000:9.1f} ms'
+            f' {resumed / rounds / count * 1e6:19.1f} us'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# usage: python3 -m benchmarks.phases
+
+import functools
+import itertools
+
+from intcode import IntCodeInterpreter
+
+from .common import best_time, load_day, load_program
+
+
+DAY07 = load_day(7)
+# outputs signal * 10 + phase, so every permutation gives a different signal
+SHIFT = '3,15,3,16,1002,16,10,16,1,16,15,15,4,15,99,0,0'
+
+
+def counted(amplify, counter):
+    def wrapper(phase, signal):
+        counter[0] += 1
+        return amplify(phase, signal)
+    return wrapper
+
+
+def forked_amplifier(program):
+    # every run starts from a fork of a machine which already waits for its phase setting
+    booted = IntCodeInterpreter(program)
+    try:
+        booted.execute()
+    except IndexError:
+        pass
+
+    def amplify(phase, signal):
+        interpreter = booted.fork()
+        interpreter.inputs.extend((phase, signal))
+        interpreter.execute()
+        return interpreter.outputs[0]
+    return amplify
+
+
+def brute_force(program, phases, counter):
+    amplify = counted(DAY07.amplifier(program), counter)
+    max_signal = None
+    for permutation in itertools.permutations(phases):
+        signal = 0
+        for phase in permutation:
+            signal = amplify(phase, signal)
+        max_signal = signal if max_signal is None else max(max_signal, signal)
+    return max_signal
+
+
+def trie(program, phases, counter, fork=False, cache=False):
+    # without forking, every amplifier runs on a new machine like in Day07
+    amplify = counted(forked_amplifier(program) if fork else DAY07.amplifier(program), counter)
+    if cache:
+        amplify = functools.lru_cache(maxsize=None)(amplify)
+    return DAY07.search_thruster_signal(amplify, frozenset(phases))
+
+
+SEARCHES = [
+    ('brute force', brute_force),
+    ('prefix trie', trie),
+    ('trie + fork', functools.partial(trie, fork=True)),
+    ('trie + fork + cache', functools.partial(trie, fork=True, cache=True)),
+    ('trie + cache', functools.partial(trie, cache=True)),
+]
+
+
+def main():
+    print(f'{"program":<8} {"phases":>6} {"search":<20} {"executions":>10} {"time":>12}')
+    for name, program, phases in [
+            ('Day07', load_program(7), range(5)),
+            ('shift', SHIFT, range(5)),
+            ('shift', SHIFT, range(7)),
+            ('shift', SHIFT, range(8)),
+    ]:
+        expected = None
+        for label, search in SEARCHES:
+            if search is brute_force and len(phases) > 7:
+                continue
+            counter = [0]
+            result = search(program, phases, counter)
+            assert expected is None or result == expected
+            expected = result
+            seconds = best_time(
+                lambda: search(program, phases, [0]),  # pylint: disable=cell-var-from-loop
+                repeat=1,
+            )
+            print(
+                f'{name:<8} {len(phases):>6} {label:<20} {counter[0]:>10}'
+                f' {seconds * 1000:9.1f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
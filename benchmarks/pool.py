@@ -0,0 +1,79 @@
+# usage: python3 -m benchmarks.pool
+
+import itertools
+
+from intcode import IntCodeInterpreter, MachinePool, parse_program
+
+from .common import best_time, load_program
+
+
+def noun_verb_fresh(program, pairs):
+    outputs = []
+    for noun, verb in pairs:
+        interpreter = IntCodeInterpreter(program)
+        interpreter.write(1, noun)
+        interpreter.write(2, verb)
+        interpreter.execute()
+        outputs.append(interpreter.read(0))
+    return outputs
+
+
+def noun_verb_pooled(program, pairs):
+    pool, outputs = MachinePool(program), []
+    for noun, verb in pairs:
+        with pool.machine() as interpreter:
+            interpreter.write(1, noun)
+            interpreter.write(2, verb)
+            interpreter.execute()
+            outputs.append(interpreter.read(0))
+    return outputs
+
+
+def amplifiers_fresh(program, permutations):
+    signals = []
+    for phases in permutations:
+        signal = 0
+        for phase in phases:
+            interpreter = IntCodeInterpreter(program, inputs=[phase, signal])
+            interpreter.execute()
+            signal = interpreter.outputs[0]
+        signals.append(signal)
+    return signals
+
+
+def amplifiers_pooled(program, permutations):
+    pool, signals = MachinePool(program), []
+    for phases in permutations:
+        signal = 0
+        for phase in phases:
+            with pool.machine(inputs=[phase, signal]) as interpreter:
+                interpreter.execute()
+                signal = interpreter.outputs[0]
+        signals.append(signal)
+    return signals
+
+
+def main():
+    day02, day07 = parse_program(load_program(2)), parse_program(load_program(7))
+    print(f'{"workload":<28} {"fresh":>12} {"pooled":>12} {"speedup":>8}')
+    for name, fresh, pooled, program, parameters in [
+            ('Day02 10k nouns and verbs', noun_verb_fresh, noun_verb_pooled, day02,
+             list(itertools.product(range(100), range(100)))),
+            ('Day07 120 permutations', amplifiers_fresh, amplifiers_pooled, day07,
+             list(itertools.permutations(range(5)))),
+    ]:
+        assert fresh(program, parameters) == pooled(program, parameters)
+        fresh_time = best_time(
+            lambda: fresh(program, parameters),  # pylint: disable=cell-var-from-loop
+        )
+        pooled_time = best_time(
+            lambda: pooled(program, parameters),  # pylint: disable=cell-var-from-loop
+        )
+        print(
+            f'{name:<28} {fresh_time * 1000:9.1f} ms {pooled_time * 1000:9.1f} ms'
+            f' {fresh_time / pooled_time:7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# usage: python3 -m benchmarks.replay
+
+import copy
+import random
+import time
+
+from intcode import RecordingCompiledIntCodeInterpreter, Replayer
+
+from .common import load_program
+
+
+def record(interval):
+    # plays the Day13 game with the paddle following the ball
+    interpreter = RecordingCompiledIntCodeInterpreter(load_program(13), interval=interval)
+    interpreter.write(0, 2)
+    machine = interpreter.run()
+    ball = paddle = 0
+    try:
+        value = next(machine)
+        while True:
+            if value is None:
+                value = machine.send((ball > paddle) - (ball < paddle))
+                continue
+            x, _, tile = value, next(machine), next(machine)
+            if tile == 3:
+                paddle = x
+            elif tile == 4:
+                ball = x
+            value = next(machine)
+    except StopIteration:
+        pass
+    return interpreter
+
+
+def main():
+    random.seed(2019)
+    print(f'{"interval":>8} {"events":>7} {"checkpoints":>11} {"record":>10} {"verify":>10}'
+          f' {"seek":>10} {"from start":>10}')
+    for interval in (100, 1000, 10000, 10 ** 9):
+        start = time.perf_counter()
+        interpreter = record(interval)
+        recorded = time.perf_counter() - start
+        trace = interpreter.trace
+        replayer = Replayer(trace)
+
+        start = time.perf_counter()
+        replayer.verify()
+        verified = time.perf_counter() - start
+
+        # the same seeks with only the checkpoint at the start to go from
+        unindexed = copy.copy(trace)
+        unindexed.checkpoints = {0: trace.checkpoints[0]}
+        steps = [random.randrange(len(trace.events) + 1) for _ in range(20)]
+        seeks = []
+        for seeker in (replayer, Replayer(unindexed)):
+            start = time.perf_counter()
+            for step in steps:
+                seeker.seek(step)
+            seeks.append((time.perf_counter() - start) / len(steps))
+        print(
+            f'{interval:>8} {len(trace.events):>7} {len(trace.checkpoints):>11}'
+            f' {recorded * 1000:7.1f} ms {verified * 1000:7.1f} ms {seeks[0] * 1000:7.1f} ms'
+            f' {seeks[1] * 1000:7.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# usage: python3 -m benchmarks.scheduler
+
+from collections import defaultdict
+import itertools
+import time
+
+from intcode import Scheduler, parse_program
+
+from .common import load_program
+
+
+# never waits for input and never halts
+RUNAWAY = [1105, 1, 0]
+
+
+def submit_jobs(scheduler):
+    # returns the jobs by kind, the runaways come first to get the first slices
+    jobs = defaultdict(list)
+    diagnostic, boost, amplifier = (parse_program(load_program(day)) for day in (5, 9, 7))
+    for index in range(5):
+        jobs['runaway'].append(
+            scheduler.submit(RUNAWAY, name=f'runaway {index}', max_instructions=2 * 10 ** 6)
+        )
+    for index in range(300):
+        jobs['diagnostic'].append(
+            scheduler.submit(diagnostic, inputs=[5], name=f'diagnostic {index}')
+        )
+    jobs['boost'].append(scheduler.submit(boost, inputs=[2], name='boost'))
+    for phases in itertools.islice(itertools.permutations(range(5, 10)), 40):
+        amplifiers = [
+            scheduler.submit(amplifier, inputs=[phase], name=f'amplifier {phases}')
+            for phase in phases
+        ]
+        for source, target in zip(amplifiers, amplifiers[1:] + amplifiers[:1]):
+            scheduler.pipe(source, target)
+        scheduler.send(amplifiers[0], 0)
+        jobs['amplifier'] += amplifiers
+    return jobs
+
+
+def main():
+    for slice_instructions in (1000, 10000, 100000):
+        scheduler = Scheduler(slice_instructions=slice_instructions)
+        jobs = submit_jobs(scheduler)
+        start = time.perf_counter()
+        scheduler.run()
+        seconds = time.perf_counter() - start
+        metrics = scheduler.metrics()
+        print(f'{len(scheduler.jobs)} jobs, {slice_instructions:,} instructions per slice: '
+              f'{seconds * 1000:.0f} ms, {metrics["instructions"] / seconds:,.0f} instructions/s, '
+              f'{sum(job.slices for job in scheduler.jobs):,} slices')
+        for kind, kind_jobs in jobs.items():
+            states = ', '.join(sorted({job.state for job in kind_jobs}))
+            turnaround = [job.turnaround_seconds * 1000 for job in kind_jobs]
+            print(f'  {kind:<10} {len(kind_jobs):>4} {states:<8}'
+                  f' turnaround {sum(turnaround) / len(turnaround):8.1f} ms mean'
+                  f' {max(turnaround):8.1f} ms max,'
+                  f' queued {max(job.max_queue_seconds for job in kind_jobs) * 1000:6.1f} ms max')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# usage: python3 -m benchmarks.sharding
+
+import os
+
+from intcode import ShardedNetwork, mesh, ring
+
+
+def worker_program(rounds, work):
+    # reads a value, counts down from work, outputs the value incremented by one and repeats for
+    # the given number of rounds
+    program = [
+        3, 100, 1101, 0, work, 102, 1001, 102, -1, 102, 1005, 102, 6, 1001, 100, 1, 100, 4, 100,
+        1001, 101, -1, 101, 1005, 101, 0, 99,
+    ]
+    return program + [0] * (100 - len(program)) + [0, rounds, 0]
+
+
+def gossip_program(index, count):
+    # tells everybody its index, then reads what the others told it
+    return [104, index] + [3, 50] * (count - 1) + [99]
+
+
+def main():
+    print(f'{os.cpu_count()} cpus')
+    print(f'{"topology":<10} {"machines":>8} {"shards":>6} {"time":>10} {"instructions/s":>15}'
+          f' {"remote values/s":>16}')
+    count = 16
+    for shards in (1, 2, 4):
+        for name, programs, links in (
+                ('ring', [worker_program(200, 2000)] * count, ring(count)),
+                ('mesh', [gossip_program(index, count) for index in range(count)], mesh(count)),
+        ):
+            network = ShardedNetwork(programs, links, shards=shards)
+            if name == 'ring':
+                network.send(0, 0)
+            assert network.run()
+            if name == 'ring':
+                assert network.outputs[-1][-1] == 200 * count
+            else:
+                assert all(outputs == [index] for index, outputs in enumerate(network.outputs))
+            stats = [link for link in network.link_stats().values() if link['remote']]
+            remote = sum(link['values'] for link in stats) / network.seconds
+            print(f'{name:<10} {count:>8} {network.shards:>6} {network.seconds * 1000:7.1f} ms'
+                  f' {sum(network.instructions) / network.seconds:15,.0f} {remote:16,.0f}')
+
+
+if __name__ == '__main__':
+    main()
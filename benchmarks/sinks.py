@@ -0,0 +1,79 @@
+# usage: python3 -m benchmarks.sinks
+
+import time
+import tracemalloc
+
+from intcode import (
+    CallbackSink, CompiledIntCodeInterpreter, CountingSink, RingBuffer, TupleSink,
+)
+
+from .common import load_program
+
+
+class Tracker:
+    # the Day13 game state a host needs to steer the paddle
+    def __init__(self):
+        self.ball = self.paddle = self.score = 0
+
+    def append(self, tile):
+        x, y, value = tile
+        if (x, y) == (-1, 0):
+            self.score = value
+        elif value == 3:
+            self.paddle = x
+        elif value == 4:
+            self.ball = x
+
+
+def breakout(sink_factory):
+    # plays the game following the ball, the host keeps every output list unless given a sink
+    interpreter = CompiledIntCodeInterpreter(load_program(13))
+    interpreter.write(0, 2)
+    tracker = Tracker()
+    sink = sink_factory(tracker)
+    if sink is not None:
+        interpreter.outputs = sink
+    seen = 0
+    while True:
+        try:
+            interpreter.execute()
+            halted = True
+        except IndexError:
+            halted = False
+        if sink is None:
+            outputs = interpreter.outputs
+            for index in range(seen, len(outputs), 3):
+                tracker.append(outputs[index:index + 3])
+            seen = len(outputs)
+        if halted:
+            return tracker.score
+        interpreter.inputs.append((tracker.ball > tracker.paddle) - (tracker.ball < tracker.paddle))
+
+
+def ring_buffer(tracker):
+    # the host only looks at the outputs of the last frame
+    sink = RingBuffer(3 * 64)
+    records = TupleSink(3, tracker)
+    return CallbackSink(lambda value: (sink.append(value), records.append(value)))
+
+
+def main():
+    sinks = (
+        ('list', lambda tracker: None),
+        ('tuples', lambda tracker: TupleSink(3, tracker)),
+        ('callback', lambda tracker: CallbackSink(TupleSink(3, tracker).append)),
+        ('ring buffer', ring_buffer),
+        ('counting', lambda tracker: CountingSink()),
+    )
+    for name, sink_factory in sinks:
+        tracemalloc.start()
+        start = time.perf_counter()
+        score = breakout(sink_factory)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{name:<12} score {score:>6} {seconds * 1000:10.1f} ms {peak / 1024:10.0f} KiB peak')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# usage: python3 -m benchmarks.sweep
+
+import itertools
+import os
+import time
+
+from intcode import IntCodeInterpreter, Network, chain, parse_program, sweep
+
+from .common import load_program
+
+
+def first_output(numbers, noun_verb):
+    interpreter = IntCodeInterpreter(numbers)
+    interpreter.write(1, noun_verb[0])
+    interpreter.write(2, noun_verb[1])
+    interpreter.execute()
+    return interpreter.read(0)
+
+
+def feedback_signal(numbers, phases):
+    amplifiers = [IntCodeInterpreter(numbers, inputs=[phase]) for phase in phases]
+    network = Network(amplifiers, chain(len(amplifiers), feedback=True))
+    network.send(0, 0)
+    network.run()
+    return network.outputs[-1][-1]
+
+
+def main():
+    day02, day07 = parse_program(load_program(2)), parse_program(load_program(7))
+    cores = os.cpu_count()
+    counts = sorted({1, 2, max(1, cores // 2), cores})
+    print(f'{cores} cores')
+    print(f'{"sweep":<28} {"processes":>9} {"time":>12} {"evaluations/s":>14} {"speedup":>8}')
+    for name, function, numbers, parameters, target in [
+            ('Day02 all nouns and verbs', first_output, day02,
+             list(itertools.product(range(100), range(100))), None),
+            ('Day02 until 19690720', first_output, day02,
+             list(itertools.product(range(100), range(100))), 19690720),
+            ('Day07 feedback x8', feedback_signal, day07,
+             list(itertools.permutations(range(5, 10))) * 8, None),
+    ]:
+        baseline = None
+        for processes in counts:
+            start = time.perf_counter()
+            evaluations = 0
+            for _, result in sweep(function, numbers, parameters, processes=processes):
+                evaluations += 1
+                if result == target:
+                    break
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(
+                f'{name:<28} {processes:>9} {seconds * 1000:9.1f} ms'
+                f' {evaluations / seconds:14,.0f} {baseline / seconds:7.2f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
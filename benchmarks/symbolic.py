@@ -0,0 +1,45 @@
+# usage: python3 -m benchmarks.symbolic
+
+import itertools
+
+from intcode import IntCodeInterpreter, Polynomial, execute_symbolic, parse_program, solve
+
+from .common import best_time, load_program
+
+
+TARGET = 19690720
+
+
+def brute_force(numbers):
+    for noun, verb in itertools.product(range(100), range(100)):
+        interpreter = IntCodeInterpreter(numbers)
+        interpreter.write(1, noun)
+        interpreter.write(2, verb)
+        interpreter.execute()
+        if interpreter.read(0) == TARGET:
+            return noun, verb
+    return None
+
+
+def symbolic(numbers):
+    memory, _ = execute_symbolic(
+        numbers, {1: Polynomial.variable('noun'), 2: Polynomial.variable('verb')},
+    )
+    solution = next(solve(memory[0], TARGET, {'noun': range(100), 'verb': range(100)}))
+    return solution['noun'], solution['verb']
+
+
+def main():
+    numbers = parse_program(load_program(2))
+    memory, _ = execute_symbolic(
+        numbers, {1: Polynomial.variable('noun'), 2: Polynomial.variable('verb')},
+    )
+    print(f'address 0 = {memory[0]}')
+    assert brute_force(numbers) == symbolic(numbers)
+    for label, search in [('brute force', brute_force), ('symbolic', symbolic)]:
+        seconds = best_time(lambda: search(numbers))  # pylint: disable=cell-var-from-loop
+        print(f'{label:<24} {seconds * 1000:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# usage: python3 -m benchmarks.timeline [directory for the trace files]
+
+import itertools
+import os
+import sys
+import time
+
+from intcode import (
+    CompiledIntCodeInterpreter, Network, Timeline, TimelineCompiledIntCodeInterpreter, chain,
+)
+
+from .common import load_day, load_program
+
+
+def feedback_loop(timeline=None):
+    # the Day07 amplifiers for one permutation of phases, each on its own track
+    phases = (9, 8, 7, 6, 5)
+    if timeline is None:
+        amplifiers = [
+            CompiledIntCodeInterpreter(load_program(7), inputs=[phase]) for phase in phases
+        ]
+    else:
+        amplifiers = [
+            TimelineCompiledIntCodeInterpreter(
+                load_program(7), inputs=[phase], timeline=timeline, name=f'amplifier {index}',
+            )
+            for index, phase in enumerate(phases)
+        ]
+    network = Network(amplifiers, chain(len(amplifiers), feedback=True), timeline=timeline)
+    network.send(0, 0)
+    network.run()
+    return network.outputs[-1][-1]
+
+
+def breakout(timeline=None):
+    # the Day13 host following the ball, one round trip per frame
+    day13 = load_day(13)
+    if timeline is None:
+        interpreter = CompiledIntCodeInterpreter(load_program(13))
+    else:
+        interpreter = TimelineCompiledIntCodeInterpreter(
+            load_program(13), timeline=timeline, name='game',
+        )
+    interpreter.write(0, 2)
+    screen = day13.Screen()
+    machine = day13.boot(interpreter)
+    waiting = day13.run_frames(interpreter, machine, screen, [])
+    for frame in itertools.count():
+        if not waiting:
+            return screen.score
+        joystick = day13.sign(screen.ball.x - screen.paddle.x)
+        if timeline is None:
+            waiting = day13.run_frames(interpreter, machine, screen, [joystick])
+            continue
+        with timeline.span('frame', track='host', frame=frame, joystick=joystick):
+            waiting = day13.run_frames(interpreter, machine, screen, [joystick])
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    for name, workload in (('day07-feedback', feedback_loop), ('day13-breakout', breakout)):
+        # the first run compiles the program, which is cached for the timed ones
+        workload()
+        start = time.perf_counter()
+        expected = workload()
+        plain = time.perf_counter() - start
+        timeline = Timeline()
+        start = time.perf_counter()
+        assert workload(timeline) == expected
+        traced = time.perf_counter() - start
+        print(f'{name:<16} {len(timeline.events):>8,} events, {plain * 1000:8.1f} ms plain,'
+              f' {traced * 1000:8.1f} ms traced')
+        if directory is not None:
+            timeline.save(os.path.join(directory, f'{name}.json'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# usage: python3 -m benchmarks.typed
+
+import gc
+import random
+import time
+import tracemalloc
+
+from intcode import CompiledIntCodeInterpreter, IntCodeInterpreter, PagedMemory, TypedMemory
+
+from .common import best_time, load_program
+from .memory import scatter_program
+
+
+MEMORIES = [('list', PagedMemory), ('array(q)', TypedMemory)]
+
+
+def footprint(build):
+    # bytes still allocated after building (and running) a machine, including its ints
+    gc.collect()
+    tracemalloc.start()
+    interpreter = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del interpreter
+    return size
+
+
+def large_program(cells):
+    # a short program halting at once, followed by lots of data
+    random.seed(2019)
+    return '99,' + ','.join(str(random.randint(-10 ** 12, 10 ** 12)) for _ in range(cells))
+
+
+def run(program, memory_class, inputs=None, interpreter_class=IntCodeInterpreter):
+    def build():
+        interpreter = interpreter_class(program, inputs=inputs, memory_class=memory_class)
+        interpreter.execute()
+        return interpreter
+    return build
+
+
+def main():
+    print(f'{"workload":<32} {"memory":<9} {"footprint":>12} {"time":>10}')
+    for name, program, inputs in [
+            ('1,000,000 data cells', large_program(1_000_000), None),
+            ('100,000 writes, stride 1', scatter_program(100_000, 1), None),
+            ('1,000 writes, stride 10,000', scatter_program(1000, 10_000), None),
+            ('Day09 BOOST part 2', load_program(9), [2]),
+    ]:
+        for label, memory_class in MEMORIES:
+            build = run(program, memory_class, inputs)
+            size = footprint(build)
+            seconds = best_time(build, repeat=1)
+            print(f'{name:<32} {label:<9} {size / 1024:9,.0f} kB {seconds * 1000:7.1f} ms')
+    print()
+    print('compiled Day09 BOOST part 2')
+    for label, memory_class in MEMORIES:
+        start = time.perf_counter()
+        interpreter = run(load_program(9), memory_class, [2], CompiledIntCodeInterpreter)()
+        assert interpreter.outputs == [46643]
+        print(f'{label:<9} {(time.perf_counter() - start) * 1000:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# usage: python3 -m benchmarks.watchdog
+
+from intcode import CycleDetectingIntCodeInterpreter, IntCodeInterpreter, supervise
+
+from .common import best_time, load_program, report
+
+
+# jumps to itself forever
+TIGHT_LOOP = [1105, 1, 0]
+# flips cell 7 between 0 and 1 forever
+TOGGLE = [1008, 7, 0, 7, 1105, 1, 0, 0]
+# counts in cell 7 forever, which never repeats a state
+COUNTER = [1001, 7, 1, 7, 1105, 1, 0, 0]
+
+
+def main():
+    runs = (
+        ('tight loop', TIGHT_LOOP, {}),
+        ('toggle', TOGGLE, {}),
+        ('counter', COUNTER, {'max_instructions': 10 ** 6}),
+        ('counter', COUNTER, {'max_seconds': 0.5}),
+        ('diagnostic', load_program(5), {}),
+    )
+    for name, program, budgets in runs:
+        interpreter = CycleDetectingIntCodeInterpreter(program, inputs=[5])
+        status = supervise(interpreter, **budgets)
+        limits = ', '.join(f'{key}={value}' for key, value in budgets.items())
+        print(f'{name:<12} {limits:<24} {status.outcome:<18} {status.instructions:>10,}'
+              f' instructions {status.seconds * 1000:8.1f} ms  {status.error or ""}')
+
+    for label, interpreter_class in (('plain', IntCodeInterpreter),
+                                     ('cycle detecting', CycleDetectingIntCodeInterpreter)):
+        def boost():
+            interpreter = interpreter_class(load_program(9), inputs=[2])
+            status = supervise(interpreter)
+            assert interpreter.outputs == [46643], status
+            return interpreter.instruction_count
+        instructions = boost()
+        report(f'Day09 {label}', best_time(boost), instructions)
+
+
+if __name__ == '__main__':
+    main()
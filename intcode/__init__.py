@@ -0,0 +1,46 @@
+from .analysis import Analysis, analyze, load_analysis, predecode
+from .batch import BatchIntCodeInterpreter
+from .checkpoint import (
+    Checkpoint, Checkpointer, CheckpointingCompiledIntCodeInterpreter,
+    CheckpointingIntCodeInterpreter, CheckpointingMixin, resume_requested,
+)
+from .compiler import CompiledIntCodeInterpreter
+from .fusion import FusingIntCodeInterpreter
+from .image import ProgramImage, compile_image, load_program, read_program
+from .interpreter import Instruction, IntCodeInterpreter, Snapshot, parse_program
+from .memory import PAGE_SIZE, PagedMemory, TypedMemory
+from .network import Network, chain, mesh, ring
+from .opcodes import MODE, OPCODE
+from .pool import MachinePool, PooledIntCodeInterpreter
+from .profiler import Profile, ProfilingIntCodeInterpreter
+from .scheduler import BLOCKED, KILLED, Job, Scheduler
+from .sharding import ShardedNetwork
+from .sinks import CallbackSink, CountingSink, RingBuffer, TupleSink
+from .sweep import sweep
+from .symbolic import UNKNOWN, Polynomial, SymbolicError, execute_symbolic, solve
+from .timeline import (
+    Timeline, TimelineCompiledIntCodeInterpreter, TimelineIntCodeInterpreter, TimelineMixin,
+)
+from .trace import (
+    RecordingCompiledIntCodeInterpreter, RecordingIntCodeInterpreter, ReplayError, Replayer, Trace,
+)
+from .watchdog import (
+    CYCLE, HALTED, INSTRUCTION_BUDGET, CycleDetectingIntCodeInterpreter, CycleError, Status,
+    supervise,
+)
+
+__all__ = [
+    'Analysis', 'analyze', 'load_analysis', 'predecode', 'BatchIntCodeInterpreter', 'Checkpoint',
+    'Checkpointer', 'CheckpointingCompiledIntCodeInterpreter', 'CheckpointingIntCodeInterpreter',
+    'CheckpointingMixin', 'resume_requested', 'CompiledIntCodeInterpreter',
+    'FusingIntCodeInterpreter', 'ProgramImage', 'compile_image', 'load_program', 'read_program',
+    'Instruction', 'IntCodeInterpreter', 'Snapshot', 'parse_program', 'PAGE_SIZE', 'PagedMemory',
+    'TypedMemory', 'Network', 'chain', 'mesh', 'ring', 'MODE', 'OPCODE', 'MachinePool',
+    'PooledIntCodeInterpreter', 'Profile', 'ProfilingIntCodeInterpreter', 'BLOCKED', 'KILLED',
+    'Job', 'Scheduler', 'ShardedNetwork', 'CallbackSink', 'CountingSink', 'RingBuffer', 'TupleSink',
+    'sweep', 'UNKNOWN', 'Polynomial', 'SymbolicError', 'execute_symbolic', 'solve', 'Timeline',
+    'TimelineCompiledIntCodeInterpreter', 'TimelineIntCodeInterpreter', 'TimelineMixin',
+    'RecordingCompiledIntCodeInterpreter', 'RecordingIntCodeInterpreter', 'ReplayError', 'Replayer',
+    'Trace', 'CYCLE', 'HALTED', 'INSTRUCTION_BUDGET', 'CycleDetectingIntCodeInterpreter',
+    'CycleError', 'Status', 'supervise',
+]
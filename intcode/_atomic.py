@@ -0,0 +1,17 @@
+import os
+
+
+def write_atomic(path, data):
+    """Writes the bytes data to path through a temporary file moved over it, so a concurrent reader
+    or a process killed while writing never leaves half a file behind."""
+    temporary = f'{path}.{os.getpid()}'
+    try:
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,276 @@
+from collections import namedtuple
+import hashlib
+import pickle
+
+from ._atomic import write_atomic
+from .image import load_program
+from .interpreter import parse_program
+from .opcodes import MODE, OPCODE, WRITE_PARAMETERS, split_instruction
+
+
+JUMPS = (OPCODE.JUMP_IF_TRUE, OPCODE.JUMP_IF_FALSE)
+FOLDABLE = {
+    OPCODE.ADD: lambda arg1, arg2: arg1 + arg2,
+    OPCODE.MULTIPLY: lambda arg1, arg2: arg1 * arg2,
+    OPCODE.LESS_THAN: lambda arg1, arg2: int(arg1 < arg2),
+    OPCODE.EQUALS: lambda arg1, arg2: int(arg1 == arg2),
+}
+# bump whenever the pickled Analysis changes, older cache files are recomputed
+VERSION = 2
+
+Decoded = namedtuple('Decoded', field_names=['opcode', 'modes', 'parameters'])
+# successors holds the start of the blocks control continues at, indirect is set when the block
+# ends in a jump to a computed address
+Block = namedtuple('Block', field_names=['start', 'end', 'successors', 'indirect'])
+
+
+def program_hash(program):
+    return hashlib.sha256(','.join(map(str, program)).encode()).hexdigest()
+
+
+class Analysis:
+    """What can be told about a program without running it.
+
+    Code is everything reachable from address 0 by following fall-throughs and jumps to constant
+    targets. Jumps to computed addresses (returns from subroutines mostly) are assumed to lead to
+    the constant addresses the program pushes to its stack, i.e. writes in relative mode.
+    Writes in relative mode are assumed to miss the program, they usually go to the stack behind
+    it, so cells only written to in relative mode still count as constant.
+
+    Code is only followed as it is stored in the program. When the program rewrites an
+    instruction with a value computed from its input before running it, exploration stops there:
+    Day05 turns its third instruction into an addition or a jump depending on the system id, and
+    Day07 jumps through a table indexed by the phase setting. Most of the code of such programs is
+    not found, self_modifying and indirect_jumps point out where the exploration got stuck.
+    """
+
+    def __init__(self, program):
+        self.program = tuple(program)
+        self.hash = program_hash(self.program)
+        self.instructions = {}
+        self.invalid = set()
+        self.indirect_jumps = set()
+        # the constants computed from immediates only, those pushed to the stack (written in
+        # relative mode) are taken for return addresses
+        self.folded = {}
+        self._pushed = set()
+        self._explore()
+        self.code_cells = {
+            cell for ip, instruction in self.instructions.items()
+            for cell in range(ip, ip + 1 + len(instruction.modes))
+        }
+        self.writes = self._direct_writes()
+        self._written = set(self.writes.values())
+        self.self_modifying = {
+            ip: address for ip, address in self.writes.items()
+            if address in self.code_cells or address in self.invalid
+        }
+        self.dynamic_writes = {
+            ip for ip, instruction in self.instructions.items()
+            for index in WRITE_PARAMETERS.get(instruction.opcode, ())
+            if instruction.modes[index] == MODE.RELATIVE
+        }
+        self.inputs = self._sites(OPCODE.INPUT)
+        self.outputs = self._sites(OPCODE.OUTPUT)
+        self.constants = self._constants()
+        self.blocks = self._blocks()
+
+    def _decode(self, ip):
+        try:
+            opcode, modes = split_instruction(self.program[ip])
+        except ValueError:
+            return None
+        end = ip + 1 + len(modes)
+        if end > len(self.program):
+            return None
+        return Decoded(opcode, modes, self.program[ip + 1:end])
+
+    def _successors(self, ip, instruction):
+        opcode, modes, parameters = instruction
+        if opcode == OPCODE.HALT:
+            return []
+        next_ip = ip + 1 + len(modes)
+        if opcode not in JUMPS:
+            return [next_ip]
+        successors = []
+        condition = parameters[0] if modes[0] == MODE.IMMEDIATE else None
+        if condition is None or (condition != 0) != (opcode == OPCODE.JUMP_IF_TRUE):
+            successors.append(next_ip)
+        if condition is None or (condition != 0) == (opcode == OPCODE.JUMP_IF_TRUE):
+            if modes[1] == MODE.IMMEDIATE:
+                successors.append(parameters[1])
+            else:
+                self.indirect_jumps.add(ip)
+        return successors
+
+    def _explore(self):
+        pending, targets = [0], set()
+        while pending:
+            self._visit(pending.pop(), pending)
+            if not pending and self.indirect_jumps:
+                # the computed constants which may be jumped to, once everything else is known
+                new_targets = {
+                    value for value in self._pushed if 0 <= value < len(self.program)
+                } - targets
+                targets |= new_targets
+                pending.extend(new_targets)
+
+    def _visit(self, ip, pending):
+        if ip in self.instructions or ip in self.invalid or not 0 <= ip < len(self.program):
+            return
+        instruction = self._decode(ip)
+        if instruction is None:
+            self.invalid.add(ip)
+            return
+        self.instructions[ip] = instruction
+        pending.extend(self._successors(ip, instruction))
+        opcode, modes, parameters = instruction
+        if opcode in FOLDABLE and modes[:2] == (MODE.IMMEDIATE, MODE.IMMEDIATE):
+            self.folded[ip] = FOLDABLE[opcode](*parameters[:2])
+            if modes[2] == MODE.RELATIVE:
+                self._pushed.add(self.folded[ip])
+
+    def code_regions(self):
+        """Returns the (start, end) ranges of contiguous code, the rest of the program is data."""
+        regions = []
+        for cell in sorted(self.code_cells):
+            if regions and regions[-1][1] == cell:
+                regions[-1][1] = cell + 1
+            else:
+                regions.append([cell, cell + 1])
+        return [tuple(region) for region in regions]
+
+    def data_regions(self):
+        regions, start = [], 0
+        for code_start, code_end in self.code_regions():
+            if start < code_start:
+                regions.append((start, code_start))
+            start = code_end
+        if start < len(self.program):
+            regions.append((start, len(self.program)))
+        return regions
+
+    def _direct_writes(self):
+        # the addresses written to in position mode, which are known before running
+        return {
+            ip: instruction.parameters[index]
+            for ip, instruction in self.instructions.items()
+            for index in WRITE_PARAMETERS.get(instruction.opcode, ())
+            if instruction.modes[index] == MODE.POSITION
+        }
+
+    def _sites(self, opcode):
+        return sorted(
+            ip for ip, instruction in self.instructions.items() if instruction.opcode == opcode
+        )
+
+    def _constants(self):
+        # the operands whose value is known: immediates and cells no instruction writes to
+        written = self._written
+        constants = {}
+        for ip, instruction in self.instructions.items():
+            writes = WRITE_PARAMETERS.get(instruction.opcode, ())
+            parameters = enumerate(zip(instruction.modes, instruction.parameters))
+            for index, (mode, parameter) in parameters:
+                if index in writes:
+                    continue
+                if mode == MODE.IMMEDIATE:
+                    constants[ip, index] = parameter
+                elif (mode == MODE.POSITION and 0 <= parameter < len(self.program)
+                      and parameter not in written):
+                    constants[ip, index] = self.program[parameter]
+        return constants
+
+    def is_constant(self, ip):
+        """Returns whether the code of the instruction at ip is never overwritten."""
+        instruction = self.instructions[ip]
+        return self._written.isdisjoint(range(ip, ip + 1 + len(instruction.modes)))
+
+    def _blocks(self):
+        leaders = {0} | {
+            successor for ip, instruction in self.instructions.items()
+            if instruction.opcode in JUMPS or instruction.opcode == OPCODE.HALT
+            for successor in self._successors(ip, instruction)
+        } | {value for value in self._pushed if value in self.instructions}
+        blocks, starts = {}, sorted(leader for leader in leaders if leader in self.instructions)
+        for start in starts:
+            ip = start
+            while True:
+                instruction = self.instructions[ip]
+                next_ip = ip + 1 + len(instruction.modes)
+                if instruction.opcode in JUMPS or instruction.opcode == OPCODE.HALT:
+                    successors = self._successors(ip, instruction)
+                    break
+                if next_ip in leaders or next_ip not in self.instructions:
+                    successors = [next_ip] if next_ip in self.instructions else []
+                    break
+                ip = next_ip
+            blocks[start] = Block(start, next_ip, tuple(successors), ip in self.indirect_jumps)
+        return blocks
+
+    def summary(self):
+        code = sum(end - start for start, end in self.code_regions())
+        return (
+            f'{len(self.instructions)} instructions in {len(self.blocks)} blocks, '
+            f'{code} of {len(self.program)} cells code, '
+            f'{len(self.indirect_jumps)} indirect jumps, '
+            f'{len(self.self_modifying)} writes to code, '
+            f'{len(self.inputs)} inputs, {len(self.outputs)} outputs'
+        )
+
+    def disassemble(self):
+        lines = []
+        for ip in sorted(self.instructions):
+            opcode, modes, parameters = self.instructions[ip]
+            operands = ', '.join(
+                {MODE.POSITION: '[{}]', MODE.IMMEDIATE: '{}', MODE.RELATIVE: '[rb{:+d}]'}[mode]
+                .format(parameter) for mode, parameter in zip(modes, parameters)
+            )
+            notes = []
+            if ip in self.blocks:
+                notes.append('block')
+            if ip in self.self_modifying:
+                notes.append(f'writes code at {self.self_modifying[ip]}')
+            if ip in self.folded:
+                notes.append(f'= {self.folded[ip]}')
+            line = f'{ip:6d}: {opcode.name:<13} {operands}'
+            lines.append(f'{line:<48} ; {", ".join(notes)}' if notes else line)
+        return '\n'.join(lines)
+
+
+def analyze(program):
+    return Analysis(parse_program(program))
+
+
+def analysis_path(path):
+    return f'{path}.analysis'
+
+
+def load_analysis(path):
+    """Returns the analysis of the program stored as text in path.
+
+    It is only computed when the analysis cached next to the program is missing or belongs to a
+    different program, the cache is rewritten then.
+    """
+    program = load_program(path)
+    try:
+        with open(analysis_path(path), 'rb') as file:
+            version, analysis = pickle.load(file)
+        if version == VERSION and analysis.hash == program_hash(program):
+            return analysis
+    except (OSError, EOFError, ValueError, AttributeError, pickle.UnpicklingError):
+        pass
+    analysis = Analysis(program)
+    write_atomic(analysis_path(path), pickle.dumps((VERSION, analysis)))
+    return analysis
+
+
+def predecode(interpreter, analysis):
+    """Decodes the instructions of a fresh interpreter ahead of time, except for those whose code
+    the program overwrites. Returns the number of instructions decoded."""
+    count = 0
+    for ip in analysis.instructions:
+        if analysis.is_constant(ip):
+            interpreter.decode(ip)
+            count += 1
+    return count
@@ -0,0 +1,221 @@
+import numpy as np
+
+from .interpreter import MAX_INSTRUCTION_LENGTH, IntCodeInterpreter
+from .memory import PAGE_SIZE
+from .opcodes import MODE, OPCODE, WRITE_PARAMETERS, split_instruction
+
+
+# the memory of all lanes together may grow up to this many cells, lanes reaching further out
+# continue on their own
+MAX_CELLS = 1 << 25
+# products are checked in floating point, lanes coming close to the int64 range leave the batch
+MAX_PRODUCT = float(1 << 62)
+
+
+class BatchIntCodeInterpreter:
+    """Runs one program on many machines (lanes) in lockstep.
+
+    The memories of all lanes are the rows of one int64 array. Every step executes the instruction
+    at the instruction pointer shared by most running lanes, for all of them at once. Lanes which
+    would overflow int64 or access memory outside of the array continue as separate
+    IntCodeInterpreter instances working on Python ints, see fallbacks.
+    """
+
+    def __init__(self, program, lanes=None, inputs=None):
+        if inputs is not None:
+            lanes = len(inputs)
+        self.lanes = lanes
+        self.memory = np.tile(np.array(program, dtype=np.int64), (lanes, 1))
+        self.instruction_pointer = np.zeros(lanes, dtype=np.int64)
+        self.base_address = np.zeros(lanes, dtype=np.int64)
+        self.inputs = [list(lane_inputs) for lane_inputs in inputs] if inputs is not None else [
+            [] for _ in range(lanes)
+        ]
+        self.input_index = [0] * lanes
+        self.outputs = [[] for _ in range(lanes)]
+        self.halted = np.zeros(lanes, dtype=bool)
+        self.waiting = np.zeros(lanes, dtype=bool)
+        self.fallbacks = {}
+        self.instruction_count = 0
+        # set whenever lanes stop running, to recompute the running ones
+        self._changed = True
+
+    def write(self, address, values):
+        """Writes values (one per lane or a single one for all) to address in every lane."""
+        self.memory[:, address] = values
+
+    def read(self, address):
+        values = self.memory[:, address].tolist()
+        for lane, interpreter in self.fallbacks.items():
+            values[lane] = interpreter.read(address)
+        return values
+
+    def _running(self):
+        running = ~(self.halted | self.waiting)
+        running[list(self.fallbacks)] = False
+        return np.flatnonzero(running)
+
+    def _fall_back(self, lanes):
+        # the lanes continue where they are on their own, as if they had never been batched
+        for lane in lanes.tolist():
+            interpreter = IntCodeInterpreter(
+                self.memory[lane].tolist(), inputs=self.inputs[lane][self.input_index[lane]:],
+            )
+            interpreter.instruction_pointer = int(self.instruction_pointer[lane])
+            interpreter.base_address = int(self.base_address[lane])
+            interpreter.outputs = self.outputs[lane]
+            self.input_index[lane] = len(self.inputs[lane])
+            self.fallbacks[lane] = interpreter
+        self._changed = True
+
+    def _grow(self, address):
+        # makes the memory of all lanes reach up to address, unless that takes too much memory
+        size = self.memory.shape[1]
+        if address < size:
+            return True
+        grown = (address // PAGE_SIZE + 1) * PAGE_SIZE
+        if self.lanes * grown > MAX_CELLS:
+            return False
+        self.memory = np.pad(self.memory, ((0, 0), (0, grown - size)))
+        return True
+
+    def _addresses(self, lanes, ip, modes):
+        # returns the addresses of the parameters for all lanes, None for immediate parameters
+        addresses = []
+        for index, mode in enumerate(modes):
+            if mode == MODE.IMMEDIATE:
+                addresses.append(None)
+                continue
+            address = self.memory[lanes, ip + 1 + index]
+            if mode == MODE.RELATIVE:
+                address = address + self.base_address[lanes]
+            addresses.append(address)
+        return addresses
+
+    def _in_memory(self, lanes, addresses):
+        # grows the memory for addresses just behind it, returns a mask of the lanes which can
+        # stay in the batch or None if that is all of them
+        size = self.memory.shape[1]
+        if all(address is None or 0 <= address.min() and address.max() < size
+               for address in addresses):
+            return None
+        inside = np.ones(len(lanes), dtype=bool)
+        for address in addresses:
+            if address is not None:
+                inside &= address >= 0
+                if not self._grow(int(address[inside].max(initial=-1))):
+                    inside &= address < self.memory.shape[1]
+        return inside
+
+    def _step(self, lanes, ip):
+        opcode, modes = split_instruction(int(self.memory[lanes[0], ip]))
+        if opcode == OPCODE.HALT:
+            self.halted[lanes] = True
+            self._changed = True
+            return
+        addresses = self._addresses(lanes, ip, modes)
+        inside = self._in_memory(lanes, addresses)
+        if inside is not None and not inside.all():
+            self._fall_back(lanes[~inside])
+            lanes = lanes[inside]
+            addresses = [address if address is None else address[inside] for address in addresses]
+        writes = WRITE_PARAMETERS.get(opcode, ())
+        if any(addresses[index] is None for index in writes):
+            raise ValueError(f'immediate mode write parameter at address {ip}')
+        arguments = [
+            self.memory[lanes, ip + 1 + index] if address is None else self.memory[lanes, address]
+            for index, address in enumerate(addresses) if index not in writes
+        ]
+        next_ip = ip + 1 + len(modes)
+
+        if opcode in (OPCODE.ADD, OPCODE.MULTIPLY):
+            arg1, arg2 = arguments
+            if opcode == OPCODE.ADD:
+                result = arg1 + arg2
+                overflow = ((arg1 ^ result) & (arg2 ^ result)) < 0
+            else:
+                result = arg1 * arg2
+                overflow = np.abs(arg1.astype(np.float64) * arg2) >= MAX_PRODUCT
+            if overflow.any():
+                self._fall_back(lanes[overflow])
+                lanes, result, addresses[2] = (
+                    lanes[~overflow], result[~overflow], addresses[2][~overflow]
+                )
+            self.memory[lanes, addresses[2]] = result
+        elif opcode in (OPCODE.LESS_THAN, OPCODE.EQUALS):
+            arg1, arg2 = arguments
+            result = arg1 < arg2 if opcode == OPCODE.LESS_THAN else arg1 == arg2
+            self.memory[lanes, addresses[2]] = result
+        elif opcode == OPCODE.INPUT:
+            has_input = np.array([
+                self.input_index[lane] < len(self.inputs[lane]) for lane in lanes.tolist()
+            ], dtype=bool)
+            if not has_input.all():
+                self.waiting[lanes[~has_input]] = True
+                self._changed = True
+            lanes, address = lanes[has_input], addresses[0][has_input]
+            values = []
+            for lane in lanes.tolist():
+                values.append(self.inputs[lane][self.input_index[lane]])
+                self.input_index[lane] += 1
+            self.memory[lanes, address] = values
+        elif opcode == OPCODE.OUTPUT:
+            for lane, value in zip(lanes.tolist(), arguments[0].tolist()):
+                self.outputs[lane].append(value)
+        elif opcode in (OPCODE.JUMP_IF_TRUE, OPCODE.JUMP_IF_FALSE):
+            condition, target = arguments
+            jumps = condition != 0 if opcode == OPCODE.JUMP_IF_TRUE else condition == 0
+            self.instruction_pointer[lanes] = np.where(jumps, target, next_ip)
+            self.instruction_count += len(lanes)
+            return
+        elif opcode == OPCODE.ADJUST:
+            self.base_address[lanes] += arguments[0]
+        self.instruction_pointer[lanes] = next_ip
+        self.instruction_count += len(lanes)
+
+    def execute(self):
+        """Runs until every lane has halted or waits for an input, returns whether all halted.
+
+        Lanes waiting for an input continue on the next call after inputs were added for them.
+        """
+        waiting = np.flatnonzero(self.waiting).tolist()
+        self.waiting[:] = False
+        for lane in waiting:
+            if self.input_index[lane] >= len(self.inputs[lane]):
+                self.waiting[lane] = True
+        self._changed = True
+        while True:
+            if self._changed:
+                running, self._changed = self._running(), False
+                if not len(running):  # pylint: disable=len-as-condition
+                    break
+            ips = self.instruction_pointer[running]
+            ip = int(ips[0])
+            if ips.min() == ips.max():
+                lanes = running
+            else:
+                # the lanes at the most common instruction pointer go first, the others catch up
+                values, counts = np.unique(ips, return_counts=True)
+                ip = int(values[counts.argmax()])
+                lanes = running[ips == ip]
+            if ip < 0 or not self._grow(ip + MAX_INSTRUCTION_LENGTH - 1):
+                self._fall_back(lanes)
+                continue
+            # lanes which have modified their code may execute different instructions there
+            cells = self.memory[lanes, ip]
+            if cells.min() != cells.max():
+                lanes = lanes[cells == cells[0]]
+            self._step(lanes, ip)
+
+        for lane, interpreter in self.fallbacks.items():
+            interpreter.inputs = interpreter.inputs[interpreter.input_index:] + self.inputs[lane][
+                self.input_index[lane]:]
+            interpreter.input_index, self.input_index[lane] = 0, len(self.inputs[lane])
+            count = interpreter.instruction_count
+            try:
+                interpreter.execute()
+                self.halted[lane] = True
+            except IndexError:
+                self.waiting[lane] = True
+            self.instruction_count += interpreter.instruction_count - count
+        return bool(self.halted.all())
@@ -0,0 +1,128 @@
+from collections import namedtuple
+import os
+import pickle
+import sys
+
+from ._atomic import write_atomic
+from .analysis import program_hash
+from .compiler import CompiledIntCodeInterpreter
+from .interpreter import IntCodeInterpreter, parse_program
+from .memory import PAGE_BITS
+
+
+# bump whenever the pickled Checkpoint changes, older checkpoints are ignored
+VERSION = 1
+
+# delta maps the addresses whose value differs from the program to their value, inputs are those
+# not read yet, outputs whatever the machine collected them in (a list or a sink), state anything
+# the host needs to carry on
+Checkpoint = namedtuple('Checkpoint', field_names=[
+    'program_hash', 'delta', 'instruction_pointer', 'base_address', 'instruction_count',
+    'inputs', 'outputs', 'state',
+])
+
+
+def resume_requested():
+    return '--resume' in sys.argv[1:]
+
+
+def memory_delta(memory, program):
+    delta = {}
+    for address, value in enumerate(memory.cells(0, len(memory.image))):
+        if value != (program[address] if address < len(program) else 0):
+            delta[address] = value
+    for number, page in memory.pages.items():
+        for address, value in enumerate(page, start=number << PAGE_BITS):
+            if value:
+                delta[address] = value
+    return delta
+
+
+class Checkpointer:
+    """Saves the state of a machine running program to path and loads it back.
+
+    Only the cells which differ from the program are stored, next to the registers and the
+    pending I/O. Checkpoints are written to a temporary file first and then moved over the last
+    one, so a process killed while saving leaves the previous checkpoint intact. due() tells
+    whether interval instructions were executed since the last checkpoint.
+    """
+
+    def __init__(self, path, program, interval=10 ** 6):
+        self.path = path
+        self.program = tuple(parse_program(program))
+        self.hash = program_hash(self.program)
+        self.interval = interval
+        self.saved = 0
+        self.saves = 0
+
+    def due(self, interpreter):
+        return interpreter.instruction_count - self.saved >= self.interval
+
+    def save(self, interpreter, state=None):
+        checkpoint = Checkpoint(
+            self.hash, memory_delta(interpreter.memory, self.program),
+            interpreter.instruction_pointer, interpreter.base_address,
+            interpreter.instruction_count, interpreter.inputs[interpreter.input_index:],
+            interpreter.outputs, state,
+        )
+        write_atomic(
+            self.path, pickle.dumps((VERSION, checkpoint), protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        self.saved = interpreter.instruction_count
+        self.saves += 1
+
+    def load(self, interpreter_class=IntCodeInterpreter, **kwargs):
+        """Returns a machine continuing from the checkpoint together with the state saved along,
+        or None if there is no checkpoint of this program."""
+        try:
+            with open(self.path, 'rb') as file:
+                version, checkpoint = pickle.load(file)
+        except (OSError, EOFError, ValueError, AttributeError, pickle.UnpicklingError):
+            return None
+        if version != VERSION or checkpoint.program_hash != self.hash:
+            return None
+        interpreter = interpreter_class(self.program, **kwargs)
+        for address, value in checkpoint.delta.items():
+            interpreter.write(address, value)
+        interpreter.instruction_pointer = checkpoint.instruction_pointer
+        interpreter.base_address = checkpoint.base_address
+        interpreter.instruction_count = checkpoint.instruction_count
+        interpreter.inputs, interpreter.input_index = list(checkpoint.inputs), 0
+        interpreter.outputs = checkpoint.outputs
+        self.saved = checkpoint.instruction_count
+        return interpreter, checkpoint.state
+
+    def remove(self):
+        """Drops the checkpoint, e.g. once the run it belongs to is complete."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class CheckpointingMixin:
+    """Saves a checkpoint through checkpointer every interval instructions while running, the
+    dispatch loop is only left for that between slices of instructions."""
+
+    def __init__(self, program, inputs=None, checkpointer=None, **kwargs):
+        super().__init__(program, inputs=inputs, **kwargs)
+        self.checkpointer = checkpointer
+
+    def _run(self):
+        checkpointer = self.checkpointer
+        if checkpointer is None:
+            return super()._run()
+        while True:
+            budget = checkpointer.interval - (self.instruction_count - checkpointer.saved)
+            instruction = self._run_slice(max(budget, 1))
+            if instruction is not None:
+                return instruction
+            checkpointer.save(self)
+
+
+class CheckpointingIntCodeInterpreter(CheckpointingMixin, IntCodeInterpreter):
+    pass
+
+
+class CheckpointingCompiledIntCodeInterpreter(CheckpointingMixin, CompiledIntCodeInterpreter):
+    pass
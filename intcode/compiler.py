@@ -0,0 +1,252 @@
+import functools
+
+from .interpreter import MAX_INSTRUCTION_LENGTH, IntCodeInterpreter, decode_instruction
+from .opcodes import MODE, OPCODE, split_instruction
+
+
+MAX_BLOCK_LENGTH = 64
+# a block start which keeps getting overwritten is interpreted instead of recompiled every time
+MAX_RECOMPILATIONS = 8
+
+JUMPS = (OPCODE.JUMP_IF_TRUE, OPCODE.JUMP_IF_FALSE)
+ARITHMETIC = {
+    OPCODE.ADD: '{} + {}',
+    OPCODE.MULTIPLY: '{} * {}',
+    OPCODE.LESS_THAN: '1 if {} < {} else 0',
+    OPCODE.EQUALS: '1 if {} == {} else 0',
+}
+
+# returned for the halts and inputs which suspend the dispatch loop
+SUSPEND = object()
+# handed to blocks instead of an image shared with a fork, they read and write the memory then
+NO_IMAGE = ()
+
+
+class _BlockWriter:
+    """Generates the source of one basic block, a function which executes the instructions with
+    their modes and immediates baked in and returns the instruction pointer to continue at."""
+
+    def __init__(self, instructions):
+        self.instructions = instructions
+        self.lines = []
+        self.executed = 0
+        self.uses_base = self.sets_base = self.uses_outputs = False
+
+    def emit(self, line, indent=1):
+        self.lines.append('    ' * indent + line)
+
+    def exit(self, target, indent=1):
+        if self.sets_base:
+            self.emit('interpreter.base_address = base', indent)
+        self.emit(f'interpreter.instruction_count += {self.executed}', indent)
+        self.emit(f'return {target}', indent)
+
+    def parameter(self, address, value, name):
+        # parameters which were overwritten before are read at run time instead of baked in
+        if value is not None:
+            return value
+        self.emit(f'{name} = image[{address}] if {address} < size else memory[{address}]')
+        return name
+
+    def load(self, mode, address, value, name):
+        if mode == MODE.IMMEDIATE:
+            return repr(value) if value is not None else self.parameter(address, value, name)
+        value = self.parameter(address, value, name)
+        if mode == MODE.POSITION:
+            if value == name:
+                return f'(image[{name}] if 0 <= {name} < size else memory[{name}])'
+            if value < 0:
+                return f'memory[{value}]'
+            return f'(image[{value}] if {value} < size else memory[{value}])'
+        self.uses_base = True
+        self.emit(f'{name} = base + {value}')
+        return f'(image[{name}] if 0 <= {name} < size else memory[{name}])'
+
+    def store(self, mode, address, value, result, next_ip):
+        value = self.parameter(address, value, 'address')
+        if mode == MODE.RELATIVE:
+            self.uses_base = True
+            self.emit(f'address = base + {value}')
+            address, check = 'address', '0 <= address < size'
+        elif value == 'address':
+            address, check = 'address', '0 <= address < size'
+        else:
+            address, check = repr(value), f'{value} < size' if value >= 0 else 'False'
+        self.emit(f'if {check}:')
+        self.emit(f'image[{address}] = {result}', indent=2)
+        self.emit('else:')
+        self.emit(f'memory[{address}] = {result}', indent=2)
+        self.emit('size = len(image)', indent=2)
+        # the write may have hit code of this or another block, leave to get it recompiled
+        self.emit(f'if {address} in cells:')
+        self.emit(f'interpreter._invalidate({address})', indent=2)
+        self.exit(next_ip, indent=2)
+
+    def instruction(self, ip, opcode, modes, parameters, last):
+        next_ip = ip + 1 + len(modes)
+        self.emit(f'# {ip}: {opcode.name} {parameters}')
+        self.executed += 1
+        operands = [
+            (mode, ip + 1 + index, value)
+            for index, (mode, value) in enumerate(zip(modes, parameters))
+        ]
+        if opcode in ARITHMETIC:
+            arg1 = self.load(*operands[0], 'address1')
+            arg2 = self.load(*operands[1], 'address2')
+            self.emit(f'value = {ARITHMETIC[opcode].format(arg1, arg2)}')
+            self.store(*operands[2], 'value', next_ip)
+        elif opcode == OPCODE.OUTPUT:
+            self.uses_outputs = True
+            self.emit(f'outputs.append({self.load(*operands[0], "address1")})')
+        elif opcode == OPCODE.ADJUST:
+            self.uses_base = self.sets_base = True
+            self.emit(f'base += {self.load(*operands[0], "address1")}')
+        elif opcode in JUMPS and last:
+            condition = self.load(*operands[0], 'address1')
+            target = self.load(*operands[1], 'address2')
+            comparison = '!=' if opcode == OPCODE.JUMP_IF_TRUE else '=='
+            self.emit(f'if {condition} {comparison} 0:')
+            self.exit(target, indent=2)
+            self.exit(next_ip)
+        # jumps inside of a block have constant operands, the block simply continues at the
+        # instruction they lead to
+
+    def source(self):
+        for index, (ip, cells) in enumerate(self.instructions):
+            opcode, modes = split_instruction(cells[0])
+            last = index == len(self.instructions) - 1
+            self.instruction(ip, opcode, modes, cells[1:], last)
+            if last and opcode not in JUMPS:
+                self.exit(ip + len(cells))
+        header = ['def block(interpreter, ip, image, memory, cells):', '    size = len(image)']
+        if self.uses_base:
+            header.append('    base = interpreter.base_address')
+        if self.uses_outputs:
+            header.append('    outputs = interpreter.outputs')
+        return '\n'.join(header + self.lines) + '\n'
+
+
+def constant_jump(instruction, ip, cells):
+    """Returns where a jump with an immediate condition continues, None if that is not constant."""
+    opcode, modes = instruction.opcode, instruction.modes
+    if modes[0] != MODE.IMMEDIATE or cells[1] is None:
+        return None
+    if (cells[1] != 0) != (opcode == OPCODE.JUMP_IF_TRUE):
+        return ip + 3
+    return cells[2] if modes[1] == MODE.IMMEDIATE else None
+
+
+@functools.lru_cache(maxsize=1 << 12)
+def compile_block(instructions):
+    source = _BlockWriter(instructions).source()
+    namespace = {}
+    start = instructions[0][0]
+    code = compile(source, f'<intcode block {start}>', 'exec')
+    exec(code, namespace)  # pylint: disable=exec-used
+    block = namespace['block']
+    block.source = source
+    return block
+
+
+def _interpret(interpreter, ip, image, memory, cells):  # pylint: disable=unused-argument
+    interpreter.instruction_pointer = ip
+    interpreter.step()
+    return interpreter.instruction_pointer
+
+
+class CompiledIntCodeInterpreter(IntCodeInterpreter):
+    """Runs a program as basic blocks compiled to Python functions.
+
+    A block follows jumps with constant operands and ends after any other jump, before a halt or an
+    input (which suspend the machine) or when it reaches MAX_BLOCK_LENGTH instructions.
+    Writes which land inside compiled code drop the blocks covering the address, they are
+    recompiled the next time they are entered.
+    """
+
+    def _reset_caches(self, source=None):
+        super()._reset_caches(source=source)
+        if source is not None:
+            self._blocks = dict(source._blocks)
+            self._block_owners = dict(source._block_owners)
+            self._compilations = dict(source._compilations)
+            self._overwritten = set(source._overwritten)
+        else:
+            self._blocks, self._block_owners, self._compilations = {}, {}, {}
+            self._overwritten = set()
+
+    def _invalidate(self, address):
+        super()._invalidate(address)
+        self._overwritten.add(address)
+        for start in self._block_owners.pop(address, ()):
+            self._blocks.pop(start, None)
+
+    def _block_instruction(self, ip):
+        cells = self.memory.cells(ip, ip + MAX_INSTRUCTION_LENGTH)
+        instruction = decode_instruction(ip, tuple(cells[:1 + len(split_instruction(cells[0])[1])]))
+        # overwritten parameters become dynamic, the block reads them when it runs
+        cells = tuple(
+            None if ip + index in self._overwritten else cells[index]
+            for index in range(1 + len(instruction.modes))
+        )
+        return instruction, cells
+
+    def _compile(self, start):
+        self._own_caches()
+        instruction, cells = self._block_instruction(start)
+        if instruction.opcode in (OPCODE.HALT, OPCODE.INPUT):
+            return SUSPEND
+        compilations = self._compilations.get(start, 0)
+        if start in self._overwritten or compilations >= MAX_RECOMPILATIONS:
+            return _interpret
+        self._compilations[start] = compilations + 1
+
+        instructions, ip = [], start
+        while len(instructions) < MAX_BLOCK_LENGTH:
+            if instructions:
+                if ip in self._overwritten:
+                    break
+                try:
+                    instruction, cells = self._block_instruction(ip)
+                except ValueError:
+                    # possibly data which is only turned into code by this very block
+                    break
+                if instruction.opcode in (OPCODE.HALT, OPCODE.INPUT):
+                    break
+            instructions.append((ip, cells))
+            if instruction.opcode in JUMPS:
+                ip = constant_jump(instruction, ip, cells)
+                if ip is None or any(ip == address for address, _ in instructions):
+                    break
+            else:
+                ip += len(cells)
+
+        block = compile_block(tuple(instructions))
+        self._blocks[start] = block
+        for address, cells in instructions:
+            for cell, value in enumerate(cells, start=address):
+                if value is not None:
+                    self._decoded_cells.add(cell)
+                    self._block_owners[cell] = self._block_owners.get(cell, ()) + (start,)
+        return block
+
+    def _run_slice(self, budget):
+        # blocks are not interrupted, a slice may exceed its budget by up to MAX_BLOCK_LENGTH
+        memory = self.memory
+        image = NO_IMAGE if memory.image_shared else memory.image
+        ip = self.instruction_pointer
+        limit = None if budget is None else self.instruction_count + budget
+        try:
+            while limit is None or self.instruction_count < limit:
+                if image is NO_IMAGE and not memory.image_shared:
+                    # the first write copied the image
+                    image = memory.image
+                # not bound to locals, a fork replaces its shared caches on the first change
+                block = self._blocks.get(ip)
+                if block is None:
+                    block = self._compile(ip)
+                    if block is SUSPEND:
+                        return self.decode(ip)
+                ip = block(self, ip, image, memory, self._decoded_cells)
+            return None
+        finally:
+            self.instruction_pointer = ip
@@ -0,0 +1,235 @@
+from collections import Counter
+
+from .interpreter import MAX_INSTRUCTION_LENGTH, IntCodeInterpreter
+from .opcodes import MODE, OPCODE
+
+
+JUMPS = (OPCODE.JUMP_IF_TRUE, OPCODE.JUMP_IF_FALSE)
+# the most instructions and cells a superinstruction covers
+MAX_FUSED_INSTRUCTIONS = 3
+MAX_FUSED_LENGTH = 12
+
+
+# Superinstructions get the same arguments as the handlers of single instructions and likewise
+# only read before their side effects, or undo them, so they can be retried on the full memory
+# after an IndexError. Negative addresses are read from the latter, which raises. interpreter.fused
+# counts the instructions executed on top of the one dispatched.
+
+
+def _compare_jump(interpreter, memory, ip, operands):
+    # a comparison followed by a jump on its result
+    less, jump_if_true, (arg1, relative1), (arg2, relative2), (result, relative3), target = operands
+    base = interpreter.base_address
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    value1, value2 = memory[address1], memory[address2]
+    condition = value1 < value2 if less else value1 == value2
+    address = result + base if relative3 else result
+    interpreter.write(address, 1 if condition else 0)
+    if ip + 4 <= address < ip + 7:
+        # the comparison overwrote the jump, which is decoded again
+        return ip + 4
+    interpreter.fused += 1
+    return target if condition == jump_if_true else ip + 7
+
+
+def _adjust_then(interpreter, memory, ip, operands):
+    # an adjustment of the base address by a constant followed by any other instruction
+    amount, handler, following = operands
+    interpreter.base_address += amount
+    try:
+        next_ip = handler(interpreter, memory, ip + 2, following)
+    except IndexError:
+        interpreter.base_address -= amount
+        raise
+    interpreter.fused += 1
+    return next_ip
+
+
+def _increment_then(interpreter, memory, ip, operands):
+    # a constant added to a cell in place followed by any other instruction
+    (counter, relative), amount, end, handler, following = operands
+    address = counter + interpreter.base_address if relative else counter
+    value = memory[address] if address >= 0 else interpreter.memory[address]
+    interpreter.write(address, value + amount)
+    if ip <= address < end:
+        # the counter lies in the fused code, which is decoded again
+        return ip + 4
+    try:
+        next_ip = handler(interpreter, memory, ip + 4, following)
+    except IndexError:
+        interpreter.write(address, value)
+        raise
+    interpreter.fused += 1
+    return next_ip
+
+
+class FusingIntCodeInterpreter(IntCodeInterpreter):
+    """An IntCodeInterpreter which dispatches common sequences of instructions as one.
+
+    Superinstructions are formed the first time the dispatch loop reaches their first
+    instruction: a comparison followed by a jump on its result, and a constant base address
+    adjustment or counter increment followed by any other instruction (possibly fused itself).
+    A write to any of their cells drops them, they are fused again from the new code. fusions
+    counts the superinstructions formed per kind, dispatches the handlers called. Fewer
+    dispatches do not always pay off, Day13 runs slower fused than plain (see benchmarks/fusion.py).
+    """
+
+    def __init__(self, program, inputs=None):
+        self.fusions = Counter()
+        self.fused = self.dispatches = 0
+        super().__init__(program, inputs=inputs)
+
+    def fork(self):
+        child = super().fork()
+        child.fusions = Counter(self.fusions)
+        return child
+
+    def _reset_caches(self, source=None):
+        super()._reset_caches(source=source)
+        # what the dispatch loop runs at an address, a superinstruction or a plain instruction,
+        # and the cell after the last one of the superinstructions
+        self._dispatch = dict(source._dispatch) if source is not None else {}
+        self._spans = dict(source._spans) if source is not None else {}
+        # the starts of the superinstructions covering a cell
+        self._owners = {
+            cell: set(starts) for cell, starts in source._owners.items()
+        } if source is not None else {}
+        # cells of code which was modified, code which keeps modifying itself is not fused
+        self._overwritten = set(source._overwritten) if source is not None else set()
+
+    def _invalidate(self, address):
+        # the loop of IntCodeInterpreter._invalidate, also dropping the plain instructions kept
+        # for dispatch, code which is modified all the time invalidates a lot
+        self._own_caches()
+        decoded, dispatch, spans = self._decoded, self._dispatch, self._spans
+        for start in range(address - MAX_INSTRUCTION_LENGTH + 1, address + 1):
+            instruction = decoded.get(start)
+            if instruction is not None and address < start + 1 + len(instruction.modes):
+                del decoded[start]
+                if start not in spans:
+                    dispatch.pop(start, None)
+        self._decoded_cells.discard(address)
+        self._overwritten.add(address)
+        if address in self._owners:
+            for start in self._owners.pop(address):
+                if spans.get(start, start) > address:
+                    del dispatch[start], spans[start]
+
+    def _fuse(self, ip, depth=1):
+        # returns what to dispatch at ip, fusing it with the following instructions if possible,
+        # instructions which were not are simply decoded
+        self._own_caches()
+        instruction = self.decode(ip)
+        end = ip + 1 + len(instruction.modes)
+        fusion = None
+        if (
+                depth < MAX_FUSED_INSTRUCTIONS and instruction.handler is not None
+                and self._overwritten.isdisjoint(range(ip, end))
+        ):
+            fusion = self._fuse_compare_jump(ip, instruction) or self._fuse_prefix(
+                ip, instruction, depth,
+            )
+        if fusion is None or not self._overwritten.isdisjoint(range(ip, fusion[2])):
+            self._dispatch[ip] = instruction
+            return instruction
+        kind, instruction, end = fusion
+        self.fusions[kind] += 1
+        self._decoded_cells.update(range(ip, end))
+        self._dispatch[ip], self._spans[ip] = instruction, end
+        for cell in range(ip, end):
+            self._owners.setdefault(cell, set()).add(ip)
+        return instruction
+
+    def _following(self, ip, depth):
+        # returns what runs after a prefix at ip and the cell after its last one
+        instruction = self._dispatch.get(ip)
+        if instruction is None:
+            try:
+                instruction = self._fuse(ip, depth)
+            except ValueError:
+                return None, None
+        if instruction.handler is None:
+            return None, None
+        return instruction, self._spans.get(ip, ip + 1 + len(instruction.modes))
+
+    def _fuse_compare_jump(self, ip, instruction):
+        if instruction.opcode not in (OPCODE.LESS_THAN, OPCODE.EQUALS):
+            return None
+        try:
+            jump = self.decode(ip + 4)
+        except ValueError:
+            return None
+        # only a jump has the operands looked at below
+        if jump.opcode not in JUMPS:
+            return None
+        result, condition = instruction.operands[2], jump.operands[0]
+        if (
+                jump.modes[1] != MODE.IMMEDIATE
+                or jump.modes[0] != instruction.modes[2] or condition != result
+                or instruction.modes[2] == MODE.POSITION and ip + 4 <= result[0] < ip + 7
+        ):
+            return None
+        operands = (
+            instruction.opcode == OPCODE.LESS_THAN, jump.opcode == OPCODE.JUMP_IF_TRUE,
+            *instruction.operands, self.memory[ip + 6],
+        )
+        fused = instruction._replace(handler=_compare_jump, operands=operands)
+        return 'compare_jump', fused, ip + 7
+
+    def _fuse_prefix(self, ip, instruction, depth):
+        opcode, modes, operands = instruction.opcode, instruction.modes, instruction.operands
+        if opcode == OPCODE.ADJUST and modes[0] == MODE.IMMEDIATE:
+            kind, length = 'adjust', 2
+        elif (
+                opcode == OPCODE.ADD and MODE.IMMEDIATE in modes[:2]
+                and modes[2] != MODE.IMMEDIATE and modes[2] in modes[:2]
+                and operands[modes.index(modes[2])] == operands[2]
+        ):
+            kind, length = 'increment', 4
+        else:
+            return None
+        following, end = self._following(ip + length, depth + 1)
+        if following is None or end - ip > MAX_FUSED_LENGTH:
+            return None
+        if kind == 'adjust':
+            handler, operands = _adjust_then, (self.memory[ip + 1], following.handler)
+        else:
+            amount = self.memory[ip + 1 + modes.index(MODE.IMMEDIATE)]
+            handler, operands = _increment_then, (operands[2], amount, end, following.handler)
+        operands += (following.operands,)
+        return kind, instruction._replace(handler=handler, operands=operands), end
+
+    def _run_slice(self, budget):
+        # the budget counts dispatches, a slice exceeds it by the instructions fused into them
+        memory = self.memory
+        image = memory if memory.image_shared else memory.image
+        ip, count, fused = self.instruction_pointer, 0, self.fused
+        try:
+            while budget is None or count < budget:
+                if image is memory and not memory.image_shared:
+                    image = memory.image
+                # not bound to a local, a fork replaces its shared caches on the first change
+                instruction = self._dispatch.get(ip)
+                if instruction is None:
+                    if ip in self._overwritten:
+                        # code which was modified is not fused anymore
+                        self._own_caches()
+                        instruction = self._dispatch[ip] = self.decode(ip)
+                    else:
+                        instruction = self._fuse(ip)
+                handler = instruction.handler
+                if handler is None:
+                    return instruction
+                try:
+                    ip = handler(self, image, ip, instruction.operands)
+                except IndexError:
+                    ip = handler(self, memory, ip, instruction.operands)
+                count += 1
+            return None
+        finally:
+            self.instruction_pointer = ip
+            self.dispatches += count
+            self.instruction_count += count + self.fused - fused
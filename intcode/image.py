@@ -0,0 +1,131 @@
+from array import array
+import fileinput
+import hashlib
+import mmap
+import struct
+import sys
+
+from ._atomic import write_atomic
+from .interpreter import parse_program
+
+
+# magic, byte order of the cells, number of cells, number of big ints, sha256 of the source text
+HEADER = struct.Struct('<8sc3xQQ32s')
+MAGIC = b'INTCODE1'
+BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+# a big int entry: index of its cell and length of its signed big-endian bytes, followed by those
+BIG_INT = struct.Struct('<QI')
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def source_hash(text):
+    return hashlib.sha256(text.strip().encode()).digest()
+
+
+def compile_image(text):
+    """Returns the binary image of a program in its text format.
+
+    The image is the header, the cells as native int64 and a side table for the ints which do
+    not fit, their cells hold 0.
+    """
+    numbers = parse_program(text.strip())
+    cells, big_ints = array('q'), []
+    for index, number in enumerate(numbers):
+        if INT64_MIN <= number <= INT64_MAX:
+            cells.append(number)
+        else:
+            cells.append(0)
+            big_ints.append((index, number))
+    parts = [HEADER.pack(MAGIC, BYTE_ORDER, len(cells), len(big_ints), source_hash(text)), cells]
+    for index, number in big_ints:
+        data = number.to_bytes((number.bit_length() + 8) // 8, 'big', signed=True)
+        parts += [BIG_INT.pack(index, len(data)), data]
+    return b''.join(bytes(part) for part in parts)
+
+
+class ProgramImage:
+    """A memory-mapped binary program image.
+
+    cells is a memoryview of the int64 cells straight out of the file, big_ints maps the indices of
+    the cells holding 0 in their place to their actual values. Only cells is free of copies,
+    tolist() builds the list of ints an interpreter runs on.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.cells = None
+        try:
+            self._load(path)
+        except BaseException:
+            # a truncated or foreign file must not leave the mapping open
+            self.close()
+            raise
+
+    def _load(self, path):
+        magic, byte_order, count, big_ints, self.source_hash = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or byte_order != BYTE_ORDER:
+            raise ValueError(f'{path} is no program image for this machine')
+        end = HEADER.size + 8 * count
+        if end > len(self._mmap):
+            raise ValueError(f'{path} is truncated')
+        self.cells = memoryview(self._mmap)[HEADER.size:end].cast('q')
+        self.big_ints = {}
+        for _ in range(big_ints):
+            index, length = BIG_INT.unpack_from(self._mmap, end)
+            end += BIG_INT.size
+            if end + length > len(self._mmap):
+                raise ValueError(f'{path} is truncated')
+            self.big_ints[index] = int.from_bytes(self._mmap[end:end + length], 'big', signed=True)
+            end += length
+
+    def tolist(self):
+        numbers = self.cells.tolist()
+        for index, number in self.big_ints.items():
+            numbers[index] = number
+        return numbers
+
+    def close(self):
+        if self.cells is not None:
+            self.cells.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def image_path(path):
+    return f'{path}.intcode'
+
+
+def load_program(path):
+    """Returns the program stored as text in path as a list of ints.
+
+    The text is only parsed when the image cached next to it is missing or belongs to different
+    contents, the image is rewritten then. It is still read and hashed every time to check the
+    image, so a cached load saves the parsing, not the reading, and returns a fresh list.
+    """
+    with open(path, 'rb') as file:
+        text = file.read().decode()
+    digest = source_hash(text)
+    try:
+        with ProgramImage(image_path(path)) as image:
+            if image.source_hash == digest:
+                return image.tolist()
+    except (OSError, ValueError, struct.error):
+        pass
+    write_atomic(image_path(path), compile_image(text))
+    return parse_program(text.strip())
+
+
+def read_program():
+    """Returns the program given on the command line like fileinput does, i.e. from the first file
+    named in the arguments (using its image cache) or from stdin. Options like --resume are
+    skipped."""
+    files = [name for name in sys.argv[1:] if name != '-' and not name.startswith('--')]
+    if files:
+        return load_program(files[0])
+    return parse_program([line.rstrip('\n') for line in fileinput.input(files=('-',))][0])
@@ -0,0 +1,333 @@
+from collections import namedtuple
+import copy
+import functools
+
+from .memory import PagedMemory
+from .opcodes import MODE, OPCODE, WRITE_PARAMETERS, split_instruction
+
+
+# operands are (offset, relative) pairs: the parameter lives at memory[offset], shifted by the
+# base address if relative, immediate parameters point at the instruction cell holding them.
+# Handlers get either the dense program image (a plain list) or the full paged memory, they only
+# read before their single side effect so they can be retried on the latter after an IndexError.
+# Negative addresses are read from the paged memory, which raises, a list would wrap around.
+# Inputs and halts have no handler, they suspend the dispatch loop and are dealt with by the caller
+Instruction = namedtuple('Instruction', field_names=['handler', 'opcode', 'modes', 'operands'])
+
+Snapshot = namedtuple('Snapshot', field_names=[
+    'memory', 'instruction_pointer', 'base_address', 'inputs', 'instruction_count',
+])
+
+
+def parse_program(program):
+    if not isinstance(program, str):
+        return list(program)
+    return [int(number) for number in program.split(',')]
+
+
+def _add(interpreter, memory, ip, operands):
+    base = interpreter.base_address
+    (arg1, relative1), (arg2, relative2), (result, relative3) = operands
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    interpreter.write(result + base if relative3 else result, memory[address1] + memory[address2])
+    return ip + 4
+
+
+def _multiply(interpreter, memory, ip, operands):
+    base = interpreter.base_address
+    (arg1, relative1), (arg2, relative2), (result, relative3) = operands
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    interpreter.write(result + base if relative3 else result, memory[address1] * memory[address2])
+    return ip + 4
+
+
+def _output(interpreter, memory, ip, operands):
+    (arg, relative), = operands
+    address = arg + interpreter.base_address if relative else arg
+    if address < 0:
+        memory = interpreter.memory
+    interpreter.outputs.append(memory[address])
+    return ip + 2
+
+
+def _jump_if_true(interpreter, memory, ip, operands):
+    base = interpreter.base_address
+    (arg1, relative1), (arg2, relative2) = operands
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    if memory[address1] != 0:
+        return memory[address2]
+    return ip + 3
+
+
+def _jump_if_false(interpreter, memory, ip, operands):
+    base = interpreter.base_address
+    (arg1, relative1), (arg2, relative2) = operands
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    if memory[address1] == 0:
+        return memory[address2]
+    return ip + 3
+
+
+def _less_than(interpreter, memory, ip, operands):
+    base = interpreter.base_address
+    (arg1, relative1), (arg2, relative2), (result, relative3) = operands
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    interpreter.write(
+        result + base if relative3 else result, 1 if memory[address1] < memory[address2] else 0,
+    )
+    return ip + 4
+
+
+def _equals(interpreter, memory, ip, operands):
+    base = interpreter.base_address
+    (arg1, relative1), (arg2, relative2), (result, relative3) = operands
+    address1 = arg1 + base if relative1 else arg1
+    address2 = arg2 + base if relative2 else arg2
+    if address1 < 0 or address2 < 0:
+        memory = interpreter.memory
+    interpreter.write(
+        result + base if relative3 else result, 1 if memory[address1] == memory[address2] else 0,
+    )
+    return ip + 4
+
+
+def _adjust(interpreter, memory, ip, operands):
+    (arg, relative), = operands
+    base = interpreter.base_address
+    address = arg + base if relative else arg
+    if address < 0:
+        memory = interpreter.memory
+    interpreter.base_address += memory[address]
+    return ip + 2
+
+
+HANDLERS = {
+    OPCODE.ADD: _add,
+    OPCODE.MULTIPLY: _multiply,
+    OPCODE.INPUT: None,
+    OPCODE.OUTPUT: _output,
+    OPCODE.JUMP_IF_TRUE: _jump_if_true,
+    OPCODE.JUMP_IF_FALSE: _jump_if_false,
+    OPCODE.LESS_THAN: _less_than,
+    OPCODE.EQUALS: _equals,
+    OPCODE.ADJUST: _adjust,
+    OPCODE.HALT: None,
+}
+
+MAX_INSTRUCTION_LENGTH = 4
+
+
+# an instruction only depends on its address and its own cells, so machines running the same
+# program (or re-running it with different inputs) share their decoded instructions
+@functools.lru_cache(maxsize=1 << 16)
+def decode_instruction(ip, cells):
+    opcode, modes = split_instruction(cells[0])
+    writes = WRITE_PARAMETERS.get(opcode, ())
+    operands = []
+    for index, mode in enumerate(modes):
+        if mode == MODE.IMMEDIATE:
+            if index in writes:
+                raise ValueError(f'immediate mode write parameter at address {ip}')
+            operands.append((ip + 1 + index, False))
+        else:
+            operands.append((cells[1 + index], mode == MODE.RELATIVE))
+    return Instruction(HANDLERS[opcode], opcode, modes, tuple(operands))
+
+
+class IntCodeInterpreter:
+    def __init__(self, program, inputs=None, memory_class=PagedMemory):
+        if isinstance(program, str):
+            program = parse_program(program)
+        self.memory = memory_class(program)
+        self.instruction_pointer = 0
+        self.base_address = 0
+        self.outputs = []
+        self.inputs = list(inputs) if inputs is not None else []
+        self.input_index = 0
+        self.instruction_count = 0
+        self._reset_caches()
+
+    def _reset_caches(self, source=None):
+        # caches are only copied from a machine with the very same memory contents
+        self._decoded = dict(source._decoded) if source is not None else {}
+        self._decoded_cells = set(source._decoded_cells) if source is not None else set()
+        self._caches_shared = False
+
+    def _own_caches(self):
+        # forks share their caches until one of them is about to run or modify its code
+        if self._caches_shared:
+            self._reset_caches(source=self)
+
+    def snapshot(self):
+        return Snapshot(
+            self.memory.fork(), self.instruction_pointer, self.base_address,
+            tuple(self.inputs[self.input_index:]), self.instruction_count,
+        )
+
+    def restore(self, snapshot):
+        self.memory = snapshot.memory.fork()
+        self.instruction_pointer = snapshot.instruction_pointer
+        self.base_address = snapshot.base_address
+        self.inputs, self.input_index = list(snapshot.inputs), 0
+        self.instruction_count = snapshot.instruction_count
+        self._reset_caches()
+
+    def fork(self):
+        # the child gets the pending inputs and an empty output list, outputs produced before the
+        # fork stay with the parent. Subclasses copy any other mutable state they keep.
+        child = copy.copy(self)
+        child.memory = self.memory.fork()
+        child.inputs, child.input_index = self.inputs[self.input_index:], 0
+        child.outputs = []
+        self._caches_shared = child._caches_shared = True
+        return child
+
+    def read(self, address):
+        return self.memory[address]
+
+    def write(self, address, value):
+        memory = self.memory
+        if 0 <= address < len(memory.image) and not memory.image_shared:
+            memory.image[address] = value
+        else:
+            memory[address] = value
+        if address in self._decoded_cells:
+            self._invalidate(address)
+
+    def _invalidate(self, address):
+        self._own_caches()
+        # instructions may overlap when code jumps into the middle of another one
+        for start in range(address - MAX_INSTRUCTION_LENGTH + 1, address + 1):
+            instruction = self._decoded.get(start)
+            if instruction is not None and address < start + 1 + len(instruction.modes):
+                del self._decoded[start]
+        self._decoded_cells.discard(address)
+
+    def decode(self, ip):
+        instruction = self._decoded.get(ip)
+        if instruction is not None:
+            return instruction
+        self._own_caches()
+        _, modes = split_instruction(self.memory[ip])
+        end = ip + 1 + len(modes)
+        instruction = decode_instruction(ip, tuple(self.memory.cells(ip, end)))
+        self._decoded[ip] = instruction
+        self._decoded_cells.update(range(ip, end))
+        return instruction
+
+    def _next_input(self):
+        # raises an IndexError when out of inputs, leaving the machine at the input instruction
+        value = self.inputs[self.input_index]
+        self.input_index += 1
+        return value
+
+    def _store_input(self, instruction, value):
+        (result, relative), = instruction.operands
+        self.write(result + self.base_address if relative else result, value)
+        self.instruction_pointer += 2
+        self.instruction_count += 1
+
+    def step(self):
+        ip = self.instruction_pointer
+        instruction = self.decode(ip)
+        if instruction.opcode == OPCODE.HALT:
+            return False
+        if instruction.opcode == OPCODE.INPUT:
+            self._store_input(instruction, self._next_input())
+            return True
+        memory = self.memory
+        try:
+            ip = instruction.handler(
+                self, memory if memory.image_shared else memory.image, ip, instruction.operands,
+            )
+        except IndexError:
+            ip = instruction.handler(self, memory, ip, instruction.operands)
+        self.instruction_pointer = ip
+        self.instruction_count += 1
+        return True
+
+    def _run(self):
+        """Runs until the machine halts or reaches an input instruction and returns the latter."""
+        return self._run_slice(None)
+
+    def _run_slice(self, budget):
+        """Like _run, but returns None once about budget instructions were executed without
+        reaching an input or a halt, no budget runs as long as _run. The machine continues from
+        there on the next call. This is the one dispatch loop, subclasses changing it override
+        _run_slice so both ways of running go through their loop."""
+        # an image shared with a fork is read through the memory, so it is only copied by the
+        # first write, and indexed directly from then on
+        memory = self.memory
+        image = memory if memory.image_shared else memory.image
+        ip, count = self.instruction_pointer, self.instruction_count
+        limit = None if budget is None else count + budget
+        try:
+            while limit is None or count < limit:
+                if image is memory and not memory.image_shared:
+                    image = memory.image
+                # not bound to a local, a fork replaces its shared caches on the first change
+                instruction = self._decoded.get(ip)
+                if instruction is None:
+                    instruction = self.decode(ip)
+                handler = instruction.handler
+                if handler is None:
+                    return instruction
+                try:
+                    ip = handler(self, image, ip, instruction.operands)
+                except IndexError:
+                    # an operand lies outside of the dense image
+                    ip = handler(self, memory, ip, instruction.operands)
+                count += 1
+            return None
+        finally:
+            self.instruction_pointer, self.instruction_count = ip, count
+
+    def execute(self):
+        """Runs until the machine halts, raises an IndexError when it runs out of inputs."""
+        while True:
+            instruction = self._run()
+            if instruction.opcode == OPCODE.HALT:
+                break
+            self._store_input(instruction, self._next_input())
+
+    def run(self):
+        """Runs the machine as a generator.
+
+        Every output value is yielded, followed by None whenever the machine waits for an input,
+        which is then passed in with send(). Inputs queued in self.inputs are used first. Outputs
+        are handed out instead of being collected in self.outputs.
+        """
+        while True:
+            instruction = self._run()
+            outputs = self.outputs
+            for value in outputs:
+                yield value
+            outputs.clear()
+            if instruction.opcode == OPCODE.HALT:
+                return
+            if self.input_index < len(self.inputs):
+                value = self._next_input()
+            else:
+                value = yield from self._wait_for_input()
+            self._store_input(instruction, value)
+
+    def _wait_for_input(self):
+        value = None
+        while value is None:
+            value = yield None
+        return value
@@ -0,0 +1,201 @@
+from array import array
+
+
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+
+class PagedMemory:
+    """Sparse Intcode memory.
+
+    The program image is kept as a dense list which grows page by page when a program writes just
+    past its end, e.g. to a stack behind the code. Every other address lives in fixed-size pages
+    that are allocated (zeroed) on the first write, reading an untouched address returns 0.
+
+    Forks share the image and all pages copy-on-write: whichever side writes to a shared page (or
+    the image) first copies it. Code which writes to the image list directly has to call
+    own_image() before, interpreters rather read a shared image through the memory until their
+    first write, so a fork which never writes never copies it.
+    """
+
+    __slots__ = ('image', 'pages', 'image_shared', 'shared_pages')
+
+    def __init__(self, program):
+        self.image = list(program)
+        self.pages = {}
+        self.image_shared = False
+        self.shared_pages = set()
+
+    def __getitem__(self, address):
+        image = self.image
+        if 0 <= address < len(image):
+            return image[address]
+        if address < 0:
+            raise ValueError(f'negative address {address}')
+        page = self.pages.get(address >> PAGE_BITS)
+        return 0 if page is None else page[address & PAGE_MASK]
+
+    def __setitem__(self, address, value):
+        image = self.image
+        if 0 <= address < len(image):
+            if self.image_shared:
+                image = self.own_image()
+            image[address] = value
+        elif address < 0:
+            raise ValueError(f'negative address {address}')
+        elif address < len(image) + PAGE_SIZE:
+            self._grow(address)
+            self.image[address] = value
+        else:
+            number = address >> PAGE_BITS
+            page = self.pages.get(number)
+            if page is None:
+                page = self.pages[number] = [0] * PAGE_SIZE
+            elif number in self.shared_pages:
+                page = self.pages[number] = list(page)
+                self.shared_pages.discard(number)
+            page[address & PAGE_MASK] = value
+
+    def own_image(self):
+        if self.image_shared:
+            self.image = list(self.image)
+            self.image_shared = False
+        return self.image
+
+    def _grow(self, address):
+        # extend the image in place up to the end of the page holding address, so references to
+        # the list stay valid, and move pages which are now covered by it into the image
+        image = self.own_image()
+        size, end = len(image), (address | PAGE_MASK) + 1
+        image.extend([0] * (end - size))
+        for number in range(size >> PAGE_BITS, end >> PAGE_BITS):
+            page = self.pages.pop(number, None)
+            self.shared_pages.discard(number)
+            if page is not None:
+                start = max(number << PAGE_BITS, size)
+                image[start:(number + 1) << PAGE_BITS] = page[start & PAGE_MASK:]
+
+    def fork(self):
+        memory = PagedMemory.__new__(PagedMemory)
+        memory.image, memory.pages = self.image, dict(self.pages)
+        self.image_shared = memory.image_shared = True
+        self.shared_pages, memory.shared_pages = set(self.pages), set(self.pages)
+        return memory
+
+    def cells(self, start, stop):
+        if 0 <= start <= stop <= len(self.image):
+            return self.image[start:stop]
+        return [self[address] for address in range(start, stop)]
+
+    @property
+    def resident_pages(self):
+        return -(-len(self.image) // PAGE_SIZE) + len(self.pages)
+
+    @property
+    def private_pages(self):
+        image_pages = 0 if self.image_shared else -(-len(self.image) // PAGE_SIZE)
+        return image_pages + len(self.pages) - len(self.shared_pages)
+
+
+class TypedMemory:
+    """Intcode memory keeping cells as unboxed int64 in array('q') instead of lists of ints.
+
+    Like PagedMemory there is a dense image growing page by page and sparse pages behind it. A
+    value which does not fit into 64 bits is kept in a side table if it lands in the image, a page
+    receiving one is turned into a list. The memory is its own image, so interpreters index it
+    directly instead of a list, trading some speed for about a fifth of the footprint.
+    """
+
+    __slots__ = ('array', 'big', 'pages', 'image_shared')
+
+    def __init__(self, program):
+        self.big = {}
+        try:
+            self.array = array('q', program)
+        except OverflowError:
+            self.array = array('q')
+            for address, value in enumerate(program):
+                try:
+                    self.array.append(value)
+                except OverflowError:
+                    self.array.append(0)
+                    self.big[address] = value
+        self.pages = {}
+        self.image_shared = False
+
+    @property
+    def image(self):
+        return self
+
+    def own_image(self):
+        return self
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, address):
+        cells = self.array
+        if 0 <= address < len(cells):
+            if self.big and address in self.big:
+                return self.big[address]
+            return cells[address]
+        if address < 0:
+            raise ValueError(f'negative address {address}')
+        page = self.pages.get(address >> PAGE_BITS)
+        return 0 if page is None else page[address & PAGE_MASK]
+
+    def __setitem__(self, address, value):
+        cells = self.array
+        if not 0 <= address < len(cells):
+            if address < 0:
+                raise ValueError(f'negative address {address}')
+            if address >= len(cells) + PAGE_SIZE:
+                self._set_paged(address, value)
+                return
+            self._grow(address)
+        try:
+            cells[address] = value
+        except OverflowError:
+            cells[address] = 0
+            self.big[address] = value
+        else:
+            if self.big:
+                self.big.pop(address, None)
+
+    def _set_paged(self, address, value):
+        number = address >> PAGE_BITS
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = array('q', bytes(8 * PAGE_SIZE))
+        try:
+            page[address & PAGE_MASK] = value
+        except OverflowError:
+            page = self.pages[number] = page.tolist()
+            page[address & PAGE_MASK] = value
+
+    def _grow(self, address):
+        cells = self.array
+        size, end = len(cells), (address | PAGE_MASK) + 1
+        cells.frombytes(bytes(8 * (end - size)))
+        for number in range(size >> PAGE_BITS, end >> PAGE_BITS):
+            page = self.pages.pop(number, None)
+            if page is not None:
+                for offset in range(max(number << PAGE_BITS, size) & PAGE_MASK, PAGE_SIZE):
+                    self[(number << PAGE_BITS) + offset] = page[offset]
+
+    def fork(self):
+        memory = TypedMemory.__new__(TypedMemory)
+        memory.array, memory.big = array('q', self.array), dict(self.big)
+        memory.pages = {number: page[:] for number, page in self.pages.items()}
+        memory.image_shared = False
+        return memory
+
+    def cells(self, start, stop):
+        return [self[address] for address in range(start, stop)]
+
+    @property
+    def resident_pages(self):
+        return -(-len(self.array) // PAGE_SIZE) + len(self.pages)
+
+    private_pages = resident_pages
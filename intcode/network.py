@@ -0,0 +1,95 @@
+from collections import deque
+
+
+def chain(count, feedback=False):
+    """Returns the links connecting count machines one after the other, the last one back to the
+    first if feedback is set."""
+    links = [(index, index + 1) for index in range(count - 1)]
+    if feedback and count > 0:
+        links.append((count - 1, 0))
+    return links
+
+
+def ring(count):
+    return chain(count, feedback=True)
+
+
+def mesh(count):
+    """Returns the links connecting every machine to every other one."""
+    return [(source, target) for source in range(count) for target in range(count)
+            if source != target]
+
+
+class Network:
+    """Runs suspended machines connected by FIFO queues.
+
+    links are (source, target) pairs of machine indices, every output of the source is appended to
+    the input queue of each of its targets. Machines are resumed exactly where they stopped, one at
+    a time until they halt or wait for an input which has not been sent yet, so every instruction
+    is only executed once no matter how many rounds the values take through the network.
+    With a Timeline, every turn a machine gets is recorded as a span on the network track.
+    """
+
+    def __init__(self, machines, links, timeline=None):
+        self.machines = list(machines)
+        self.timeline = timeline
+        self.targets = [[] for _ in self.machines]
+        for source, target in links:
+            self.targets[source].append(target)
+        self.queues = [deque() for _ in self.machines]
+        # everything each machine has sent, linked or not
+        self.outputs = [[] for _ in self.machines]
+        self.halted = [False] * len(self.machines)
+        self._generators = [machine.run() for machine in self.machines]
+        # None before a machine has been started, afterwards whether it waits for an input
+        self._waiting = [None] * len(self.machines)
+        self._ready = deque(range(len(self.machines)))
+        self._scheduled = set(self._ready)
+
+    def send(self, index, value):
+        self.queues[index].append(value)
+        if self._waiting[index] and index not in self._scheduled:
+            self._ready.append(index)
+            self._scheduled.add(index)
+
+    def _resume(self, index):
+        generator, queue = self._generators[index], self.queues[index]
+        outputs, targets = self.outputs[index], self.targets[index]
+        try:
+            if self._waiting[index] is None:
+                self._waiting[index] = False
+                value = next(generator)
+            elif queue:
+                self._waiting[index] = False
+                value = generator.send(queue.popleft())
+            else:
+                return
+            while True:
+                if value is None:
+                    if not queue:
+                        self._waiting[index] = True
+                        return
+                    value = generator.send(queue.popleft())
+                else:
+                    outputs.append(value)
+                    for target in targets:
+                        self.send(target, value)
+                    value = next(generator)
+        except StopIteration:
+            self._waiting[index] = False
+            self.halted[index] = True
+
+    def run(self):
+        """Runs until every machine has halted or waits for an input nobody is going to send,
+        returns whether all of them halted."""
+        ready, scheduled, timeline = self._ready, self._scheduled, self.timeline
+        while ready:
+            index = ready.popleft()
+            scheduled.discard(index)
+            if timeline is None:
+                self._resume(index)
+                continue
+            with timeline.span('turn', track='network', machine=index,
+                               queued=len(self.queues[index])):
+                self._resume(index)
+        return all(self.halted)
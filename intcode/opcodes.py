@@ -0,0 +1,55 @@
+from enum import IntEnum
+import functools
+
+
+class OPCODE(IntEnum):
+    ADD = 1
+    MULTIPLY = 2
+    INPUT = 3
+    OUTPUT = 4
+    JUMP_IF_TRUE = 5
+    JUMP_IF_FALSE = 6
+    LESS_THAN = 7
+    EQUALS = 8
+    ADJUST = 9
+    HALT = 99
+
+
+class MODE(IntEnum):
+    POSITION = 0
+    IMMEDIATE = 1
+    RELATIVE = 2
+
+
+NUM_PARAMETERS = {
+    OPCODE.ADD: 3,
+    OPCODE.MULTIPLY: 3,
+    OPCODE.INPUT: 1,
+    OPCODE.OUTPUT: 1,
+    OPCODE.JUMP_IF_TRUE: 2,
+    OPCODE.JUMP_IF_FALSE: 2,
+    OPCODE.LESS_THAN: 3,
+    OPCODE.EQUALS: 3,
+    OPCODE.ADJUST: 1,
+    OPCODE.HALT: 0,
+}
+
+# indices of the parameters an instruction writes to, they must not be in immediate mode
+WRITE_PARAMETERS = {
+    OPCODE.ADD: (2,),
+    OPCODE.MULTIPLY: (2,),
+    OPCODE.INPUT: (0,),
+    OPCODE.LESS_THAN: (2,),
+    OPCODE.EQUALS: (2,),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def split_instruction(value):
+    opcode = OPCODE(value % 100)
+    num_parameters = NUM_PARAMETERS[opcode]
+    modes, value = [], value // 100
+    for _ in range(num_parameters):
+        value, mode = divmod(value, 10)
+        modes.append(MODE(mode))
+    return opcode, tuple(modes)
@@ -0,0 +1,77 @@
+import contextlib
+
+from .interpreter import IntCodeInterpreter, parse_program
+
+
+class PooledIntCodeInterpreter(IntCodeInterpreter):
+    """An IntCodeInterpreter which can be reset to the program it was created with.
+
+    Writes are recorded, a reset only restores the cells written since the last one. The decoded
+    instructions are kept unless the program wrote to its own code.
+    """
+
+    def __init__(self, program, inputs=None):
+        super().__init__(program, inputs=inputs)
+        self.pristine = tuple(self.memory.image)
+        self.dirty = set()
+
+    def fork(self):
+        # the cells the parent wrote differ from the program in the child as well
+        child = super().fork()
+        child.dirty = set(self.dirty)
+        return child
+
+    def write(self, address, value):
+        self.dirty.add(address)
+        super().write(address, value)
+
+    def reset(self, inputs=None):
+        memory, pristine = self.memory, self.pristine
+        image = memory.own_image()
+        if len(image) > len(pristine):
+            del image[len(pristine):]
+        memory.pages.clear()
+        memory.shared_pages.clear()
+        for address in self.dirty:
+            if address < len(pristine):
+                image[address] = pristine[address]
+        # a program which modified its own code is decoded afresh, invalidating instruction by
+        # instruction costs more than decoding the few that run again
+        if not self._decoded_cells.isdisjoint(self.dirty):
+            self._reset_caches()
+        self.dirty.clear()
+        self.instruction_pointer = self.base_address = self.instruction_count = 0
+        self.outputs = []
+        self.inputs, self.input_index = list(inputs) if inputs is not None else [], 0
+
+
+class MachinePool:
+    """Hands out machines running the same program, which are reset and reused once released.
+
+    Pools are picklable, only the program is sent along, e.g. to the workers of a sweep.
+    """
+
+    def __init__(self, program):
+        self.program = tuple(parse_program(program))
+        self._idle = []
+
+    def __getstate__(self):
+        return {'program': self.program, '_idle': []}
+
+    def acquire(self, inputs=None):
+        if self._idle:
+            interpreter = self._idle.pop()
+            interpreter.reset(inputs=inputs)
+            return interpreter
+        return PooledIntCodeInterpreter(self.program, inputs=inputs)
+
+    def release(self, interpreter):
+        self._idle.append(interpreter)
+
+    @contextlib.contextmanager
+    def machine(self, inputs=None):
+        interpreter = self.acquire(inputs=inputs)
+        try:
+            yield interpreter
+        finally:
+            self.release(interpreter)
@@ -0,0 +1,152 @@
+from collections import Counter
+import copy
+import json
+import time
+
+from .interpreter import IntCodeInterpreter
+from .opcodes import OPCODE, WRITE_PARAMETERS
+
+
+class Profile:
+    """Execution statistics collected by a ProfilingIntCodeInterpreter.
+
+    Instructions are only counted per address and per (opcode, modes) combination while running,
+    everything else is derived from these when asked for.
+    """
+
+    def __init__(self):
+        self.addresses = Counter()
+        self.shapes = Counter()
+        self.seconds = 0.0
+        self.input_seconds = 0.0
+        self.inputs = 0
+
+    @property
+    def instructions(self):
+        return sum(self.shapes.values())
+
+    @property
+    def instructions_per_second(self):
+        return self.instructions / self.seconds if self.seconds else 0.0
+
+    def opcodes(self):
+        counts = Counter()
+        for (opcode, _), count in self.shapes.items():
+            counts[opcode.name] += count
+        return dict(counts.most_common())
+
+    def accesses(self):
+        """Returns the number of parameter reads and writes per mode."""
+        reads, writes = Counter(), Counter()
+        for (opcode, modes), count in self.shapes.items():
+            for index, mode in enumerate(modes):
+                (writes if index in WRITE_PARAMETERS.get(opcode, ()) else reads)[mode.name] += count
+        return {'reads': dict(reads), 'writes': dict(writes)}
+
+    def hot_addresses(self, count=None):
+        return self.addresses.most_common(count)
+
+    def as_dict(self):
+        return {
+            'instructions': self.instructions,
+            'seconds': self.seconds,
+            'instructions_per_second': self.instructions_per_second,
+            'inputs': self.inputs,
+            'input_seconds': self.input_seconds,
+            'opcodes': self.opcodes(),
+            'accesses': self.accesses(),
+            'addresses': {str(address): count for address, count in self.hot_addresses()},
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def report(self, top=10):
+        lines = [
+            f'{self.instructions:,} instructions in {self.seconds * 1000:.1f} ms '
+            f'({self.instructions_per_second:,.0f}/s), '
+            f'{self.inputs} inputs waited for {self.input_seconds * 1000:.1f} ms',
+            'opcodes: ' + ', '.join(f'{name} {count:,}' for name, count in self.opcodes().items()),
+        ]
+        for kind, counts in self.accesses().items():
+            lines.append(
+                f'{kind}: ' + ', '.join(f'{mode} {count:,}' for mode, count in counts.items())
+            )
+        lines.append('hot addresses: ' + ', '.join(
+            f'{address} ({count:,})' for address, count in self.hot_addresses(top)
+        ))
+        return '\n'.join(lines)
+
+
+class ProfilingIntCodeInterpreter(IntCodeInterpreter):
+    """An IntCodeInterpreter collecting a Profile while it runs.
+
+    Profiling is opt-in by using this class, the dispatch loop of IntCodeInterpreter itself stays
+    untouched. Time waiting for input is the time a host takes to send() a value to run(), or to
+    call execute() again after it ran out of inputs.
+    """
+
+    def __init__(self, program, inputs=None):
+        super().__init__(program, inputs=inputs)
+        self.profile = Profile()
+        self._blocked_since = None
+
+    def fork(self):
+        # the child continues from a copy of the profile, like from the instruction count
+        child = super().fork()
+        child.profile = copy.deepcopy(self.profile)
+        return child
+
+    def _store_input(self, instruction, value):
+        self.profile.addresses[self.instruction_pointer] += 1
+        self.profile.shapes[OPCODE.INPUT, instruction.modes] += 1
+        self.profile.inputs += 1
+        super()._store_input(instruction, value)
+
+    def _next_input(self):
+        try:
+            return super()._next_input()
+        except IndexError:
+            self._blocked_since = time.perf_counter()
+            raise
+
+    def _wait_for_input(self):
+        start = time.perf_counter()
+        value = yield from super()._wait_for_input()
+        self.profile.input_seconds += time.perf_counter() - start
+        return value
+
+    def execute(self):
+        if self._blocked_since is not None:
+            self.profile.input_seconds += time.perf_counter() - self._blocked_since
+            self._blocked_since = None
+        super().execute()
+
+    def _run_slice(self, budget):
+        addresses, shapes = self.profile.addresses, self.profile.shapes
+        memory = self.memory
+        image = memory if memory.image_shared else memory.image
+        ip, count = self.instruction_pointer, self.instruction_count
+        limit = None if budget is None else count + budget
+        start = time.perf_counter()
+        try:
+            while limit is None or count < limit:
+                if image is memory and not memory.image_shared:
+                    image = memory.image
+                instruction = self._decoded.get(ip)
+                if instruction is None:
+                    instruction = self.decode(ip)
+                handler = instruction.handler
+                if handler is None:
+                    return instruction
+                addresses[ip] += 1
+                shapes[instruction.opcode, instruction.modes] += 1
+                try:
+                    ip = handler(self, image, ip, instruction.operands)
+                except IndexError:
+                    ip = handler(self, memory, ip, instruction.operands)
+                count += 1
+            return None
+        finally:
+            self.instruction_pointer, self.instruction_count = ip, count
+            self.profile.seconds += time.perf_counter() - start
@@ -0,0 +1,200 @@
+from collections import deque
+import itertools
+import time
+
+from .compiler import CompiledIntCodeInterpreter
+from .interpreter import IntCodeInterpreter
+from .opcodes import OPCODE
+
+
+READY = 'ready'
+BLOCKED = 'blocked'
+HALTED = 'halted'
+FAILED = 'failed'
+KILLED = 'killed'
+
+
+class Job:
+    """A machine hosted by a Scheduler together with its metrics.
+
+    Times are taken with time.perf_counter(). queue_seconds is the time spent ready but waiting
+    for a slice, run_seconds the time spent running, turnaround_seconds the time from the
+    submission until the job finished.
+    """
+
+    def __init__(self, name, machine, max_instructions=None):
+        self.name = name
+        self.machine = machine
+        self.max_instructions = max_instructions
+        self.state = READY
+        self.error = None
+        self.outputs = []
+        self.targets = []
+        self.instructions = self.slices = self.inputs = 0
+        self.run_seconds = self.queue_seconds = self.max_queue_seconds = 0.0
+        self.submitted = self.queued = time.perf_counter()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.state in (HALTED, FAILED, KILLED)
+
+    @property
+    def instructions_per_second(self):
+        return self.instructions / self.run_seconds if self.run_seconds else 0.0
+
+    @property
+    def turnaround_seconds(self):
+        return (self.finished if self.finished is not None else time.perf_counter()) \
+            - self.submitted
+
+    def metrics(self):
+        return {
+            'name': self.name,
+            'state': self.state,
+            'instructions': self.instructions,
+            'slices': self.slices,
+            'inputs': self.inputs,
+            'outputs': len(self.outputs),
+            'run_seconds': self.run_seconds,
+            'instructions_per_second': self.instructions_per_second,
+            'queue_seconds': self.queue_seconds,
+            'max_queue_seconds': self.max_queue_seconds,
+            'turnaround_seconds': self.turnaround_seconds,
+        }
+
+    def __repr__(self):
+        return f'Job({self.name!r}, {self.state}, {self.instructions} instructions)'
+
+
+class Scheduler:
+    """Runs many machines on one thread, round robin in time slices.
+
+    Every slice lets a job execute about slice_instructions instructions, after which it goes
+    back to the end of the ready queue, so a program which never waits for input can not starve
+    the others. Jobs waiting for an input are parked until send() (or a piped job) delivers one.
+    """
+
+    def __init__(self, slice_instructions=10000):
+        self.slice_instructions = slice_instructions
+        self.jobs = []
+        self._ready = deque()
+        self._names = itertools.count()
+
+    def submit(self, program, inputs=None, name=None, max_instructions=None,
+               interpreter_class=CompiledIntCodeInterpreter):
+        """Adds a job running program, or an interpreter to continue with, and returns it.
+        Jobs executing more than max_instructions are killed."""
+        if isinstance(program, IntCodeInterpreter):
+            machine = program
+            machine.inputs.extend(inputs or ())
+        else:
+            machine = interpreter_class(program, inputs=inputs)
+        job = Job(name if name is not None else f'job-{next(self._names)}', machine,
+                  max_instructions)
+        self.jobs.append(job)
+        self._ready.append(job)
+        return job
+
+    def pipe(self, source, target):
+        """Sends every later output of the source job to the target job."""
+        source.targets.append(target)
+
+    def send(self, job, value):
+        job.machine.inputs.append(value)
+        if job.state == BLOCKED:
+            job.state, job.queued = READY, time.perf_counter()
+            self._ready.append(job)
+
+    def kill(self, job):
+        if not job.done:
+            self._finish(job, KILLED)
+
+    def _finish(self, job, state, error=None):
+        job.state, job.error, job.finished = state, error, time.perf_counter()
+
+    def _slice(self, job):
+        machine = job.machine
+        budget = self.slice_instructions
+        if job.max_instructions is not None:
+            budget = min(budget, job.max_instructions - job.instructions)
+        start_count, start_outputs = machine.instruction_count, len(machine.outputs)
+        start = time.perf_counter()
+        job.queue_seconds += start - job.queued
+        job.max_queue_seconds = max(job.max_queue_seconds, start - job.queued)
+        error = None
+        try:
+            while True:
+                used = machine.instruction_count - start_count
+                instruction = machine._run_slice(budget - used)  # pylint: disable=protected-access
+                if instruction is None:
+                    state = READY
+                elif instruction.opcode == OPCODE.HALT:
+                    state = HALTED
+                elif machine.input_index < len(machine.inputs):
+                    # pylint: disable=protected-access
+                    machine._store_input(instruction, machine._next_input())
+                    job.inputs += 1
+                    if machine.instruction_count - start_count < budget:
+                        continue
+                    state = READY
+                else:
+                    state = BLOCKED
+                break
+        except Exception as exception:  # pylint: disable=broad-except
+            # a failing program only takes its own job down
+            state, error = FAILED, exception
+        finally:
+            end = time.perf_counter()
+            job.run_seconds += end - start
+            job.instructions += machine.instruction_count - start_count
+            job.slices += 1
+
+        outputs = machine.outputs[start_outputs:]
+        del machine.outputs[start_outputs:]
+        job.outputs.extend(outputs)
+        for target in job.targets:
+            for value in outputs:
+                self.send(target, value)
+
+        if state in (HALTED, FAILED):
+            self._finish(job, state, error)
+        elif job.max_instructions is not None and job.instructions >= job.max_instructions:
+            self._finish(job, KILLED)
+        elif state == READY:
+            job.queued = end
+            self._ready.append(job)
+        else:
+            job.state = BLOCKED
+
+    def step(self):
+        """Gives the next ready job a slice, returns False if there was none."""
+        while self._ready:
+            job = self._ready.popleft()
+            if job.state == READY:
+                self._slice(job)
+                return True
+        return False
+
+    def run(self, max_slices=None):
+        """Runs until no job is ready anymore (or for max_slices slices), returns whether all
+        jobs are done."""
+        slices = 0
+        while (max_slices is None or slices < max_slices) and self.step():
+            slices += 1
+        return all(job.done for job in self.jobs)
+
+    def metrics(self):
+        jobs = [job.metrics() for job in self.jobs]
+        instructions = sum(job['instructions'] for job in jobs)
+        seconds = sum(job['run_seconds'] for job in jobs)
+        return {
+            'jobs': jobs,
+            'instructions': instructions,
+            'run_seconds': seconds,
+            'instructions_per_second': instructions / seconds if seconds else 0.0,
+            'states': {
+                state: sum(job['state'] == state for job in jobs)
+                for state in (READY, BLOCKED, HALTED, FAILED, KILLED)
+            },
+        }
@@ -0,0 +1,255 @@
+from collections import defaultdict
+import multiprocessing
+import os
+import time
+
+from .compiler import CompiledIntCodeInterpreter
+from .network import Network
+
+
+DELIVER = 'deliver'
+PROBE = 'probe'
+STOP = 'stop'
+IDLE = 'idle'
+PROBED = 'probed'
+DONE = 'done'
+FAILED = 'failed'
+
+# values for another shard are sent in batches of at most this many, the batch is also sent once
+# the shard runs out of work
+BATCH_SIZE = 256
+
+
+def placement(count, shards):
+    """Returns the shard of every machine, neighbours share a shard so chains and rings only
+    cross shards at the ends of the blocks."""
+    return [index * shards // count for index in range(count)]
+
+
+class _Shard(Network):
+    # the machines of one worker, links hold global indices, values for machines of the same
+    # shard go straight to their queue
+    def __init__(self, indices, machines, links, assignment, inboxes):
+        self.local = {index: position for position, index in enumerate(indices)}
+        super().__init__(
+            machines, [(self.local[source], target) for source, target in links
+                       if source in self.local],
+        )
+        self.assignment, self.inboxes = assignment, inboxes
+        self.outbox = defaultdict(list)
+        self.sent = self.received = 0
+
+    def send(self, index, value):
+        position = self.local.get(index)
+        if position is not None:
+            super().send(position, value)
+            return
+        shard = self.assignment[index]
+        batch = self.outbox[shard]
+        batch.append((index, value))
+        if len(batch) >= BATCH_SIZE:
+            self._flush(shard)
+
+    def _flush(self, shard):
+        batch = self.outbox.pop(shard)
+        self.inboxes[shard].put((DELIVER, batch))
+        self.sent += len(batch)
+
+    def flush(self):
+        for shard in list(self.outbox):
+            self._flush(shard)
+
+    def deliver(self, batch):
+        self.received += len(batch)
+        for index, value in batch:
+            self.send(index, value)
+
+
+def _serve(shard_index, programs, inputs, links, assignment, inboxes, results, interpreter_class):
+    try:
+        _serve_shard(
+            shard_index, programs, inputs, links, assignment, inboxes, results, interpreter_class,
+        )
+    except Exception as exception:  # pylint: disable=broad-except
+        # reported to the host instead of leaving it waiting for the shard forever
+        results.put((FAILED, shard_index, repr(exception)))
+
+
+def _serve_shard(shard_index, programs, inputs, links, assignment, inboxes, results,
+                 interpreter_class):
+    # the loop of a worker process: run the local machines until all of them wait or halted, send
+    # the values for other shards and wait for the next message
+    indices = [index for index, shard in enumerate(assignment) if shard == shard_index]
+    machines = [interpreter_class(programs[index], inputs=inputs[index]) for index in indices]
+    shard = _Shard(indices, machines, links, assignment, inboxes)
+    inbox, seconds = inboxes[shard_index], 0.0
+    while True:
+        start = time.perf_counter()
+        shard.run()
+        shard.flush()
+        seconds += time.perf_counter() - start
+        results.put((IDLE, shard_index, shard.sent, shard.received))
+        # probes are only answered here, while the shard is idle
+        while True:
+            kind, payload = inbox.get()
+            if kind == DELIVER:
+                shard.deliver(payload)
+                break
+            if kind == PROBE:
+                results.put((PROBED, shard_index, payload, shard.sent, shard.received))
+            else:
+                results.put((DONE, shard_index, {
+                    'indices': indices,
+                    'outputs': shard.outputs,
+                    'halted': shard.halted,
+                    'instructions': [machine.instruction_count for machine in machines],
+                    'seconds': seconds,
+                }))
+                return
+
+
+class ShardedNetwork:
+    """A Network spread over worker processes, each running the machines of one shard.
+
+    Machines are created in the workers from their program and initial inputs, values between
+    machines of the same shard are passed on directly, those for other shards in batches through
+    the queue of the receiving worker. The network is quiescent when every machine halted or waits
+    for an input with none queued and no value is on its way. This is detected by counting the
+    values sent and received by each shard: two consecutive probes of all (idle) shards with the
+    same counts and as many values received as sent mean nothing is going to happen anymore.
+    """
+
+    def __init__(self, programs, links, inputs=None, shards=None,
+                 interpreter_class=CompiledIntCodeInterpreter):
+        self.programs = [list(program) for program in programs]
+        self.links = list(links)
+        self.inputs = [list(values) for values in inputs] if inputs is not None else [
+            [] for _ in self.programs
+        ]
+        self.shards = min(shards or os.cpu_count(), len(self.programs))
+        self.interpreter_class = interpreter_class
+        self.assignment = placement(len(self.programs), self.shards)
+        self._sent = defaultdict(list)
+        self.outputs = self.halted = self.instructions = None
+        self.shard_seconds = []
+        self.seconds = 0.0
+
+    def send(self, index, value):
+        """Queues a value for a machine before the network is run."""
+        self._sent[index].append(value)
+
+    def run(self):
+        """Runs until the network is quiescent, returns whether all machines halted."""
+        start = time.perf_counter()
+        if self.shards == 1:
+            self._run_locally()
+        else:
+            self._run_sharded()
+        self.seconds = time.perf_counter() - start
+        if self.shards == 1:
+            self.shard_seconds = [self.seconds]
+        return all(self.halted)
+
+    def _run_locally(self):
+        machines = [
+            self.interpreter_class(program, inputs=inputs)
+            for program, inputs in zip(self.programs, self.inputs)
+        ]
+        network = Network(machines, self.links)
+        for index, values in self._sent.items():
+            for value in values:
+                network.send(index, value)
+        network.run()
+        self.outputs, self.halted = network.outputs, network.halted
+        self.instructions = [machine.instruction_count for machine in machines]
+
+    def _run_sharded(self):
+        inboxes = [multiprocessing.Queue() for _ in range(self.shards)]
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_serve, args=(
+                shard, self.programs, self.inputs, self.links, self.assignment, inboxes, results,
+                self.interpreter_class,
+            ), daemon=True)
+            for shard in range(self.shards)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            seeded = 0
+            for shard in range(self.shards):
+                batch = [
+                    (index, value) for index, values in self._sent.items()
+                    if self.assignment[index] == shard for value in values
+                ]
+                if batch:
+                    inboxes[shard].put((DELIVER, batch))
+                    seeded += len(batch)
+            self._wait_for_quiescence(inboxes, results, seeded)
+            for inbox in inboxes:
+                inbox.put((STOP, None))
+            self._collect(results)
+        finally:
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive():
+                    worker.terminate()
+
+    def _wait_for_quiescence(self, inboxes, results, seeded):
+        # counts holds the (sent, received) of every shard as last reported, previous those of
+        # the last probe if no shard did anything since
+        counts, probed, previous, wave = {}, None, None, 0
+
+        def balanced(counts):
+            sent, received = (sum(values) for values in zip(*counts.values()))
+            return sent + seeded == received
+
+        while True:
+            kind, shard, *payload = results.get()
+            if kind == FAILED:
+                raise RuntimeError(f'shard {shard} failed: {payload[0]}')
+            if kind == IDLE:
+                counts[shard], previous = tuple(payload), None
+            elif kind == PROBED and payload[0] == wave:
+                probed[shard] = tuple(payload[1:])
+                if len(probed) < self.shards:
+                    continue
+                if probed == previous and balanced(probed):
+                    return
+                counts, previous, probed = dict(probed), dict(probed), None
+            if probed is None and len(counts) == self.shards and balanced(counts):
+                wave, probed = wave + 1, {}
+                for inbox in inboxes:
+                    inbox.put((PROBE, wave))
+
+    def _collect(self, results):
+        count = len(self.programs)
+        self.outputs, self.halted, self.instructions = [None] * count, [None] * count, [0] * count
+        self.shard_seconds = [0.0] * self.shards
+        done = 0
+        while done < self.shards:
+            kind, shard, *payload = results.get()
+            if kind == FAILED:
+                raise RuntimeError(f'shard {shard} failed: {payload[0]}')
+            if kind != DONE:
+                continue
+            result = payload[0]
+            for position, index in enumerate(result['indices']):
+                self.outputs[index] = result['outputs'][position]
+                self.halted[index] = result['halted'][position]
+                self.instructions[index] = result['instructions'][position]
+            self.shard_seconds[shard] = result['seconds']
+            done += 1
+
+    def link_stats(self):
+        """Returns the number of values passed over every link and their rate during the run,
+        remote is set for links between shards."""
+        return {
+            (source, target): {
+                'values': len(self.outputs[source]),
+                'values_per_second': len(self.outputs[source]) / self.seconds
+                if self.seconds else 0.0,
+                'remote': self.assignment[source] != self.assignment[target],
+            }
+            for source, target in self.links
+        }
@@ -0,0 +1,99 @@
+from collections import deque
+
+
+# A sink takes the place of the outputs list of an interpreter (interpreter.outputs = sink), the
+# output instructions only call its append(). Like a list, sinks can be iterated over and cleared,
+# so run() hands out what they keep. Forks start with a plain list again.
+
+
+class CallbackSink:
+    """Passes every output on to callback instead of keeping it."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.count = 0
+
+    def append(self, value):
+        self.count += 1
+        self.callback(value)
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def clear(self):
+        pass
+
+
+class RingBuffer:
+    """Keeps the last size outputs, dropped counts those pushed out."""
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+        self.dropped = 0
+
+    def append(self, value):
+        values = self.values
+        if len(values) == values.maxlen:
+            self.dropped += 1
+        values.append(value)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def clear(self):
+        self.values.clear()
+
+
+class TupleSink:
+    """Groups the outputs into tuples of arity values, e.g. the (x, y, tile) triples of Day13, and
+    appends those to records, which may be a list or another sink. pending holds the values of
+    the record which is not complete yet."""
+
+    def __init__(self, arity, records=None):
+        self.arity = arity
+        self.records = records if records is not None else []
+        self.pending = []
+
+    def append(self, value):
+        pending = self.pending
+        pending.append(value)
+        if len(pending) == self.arity:
+            self.records.append(tuple(pending))
+            pending.clear()
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def clear(self):
+        self.records.clear()
+
+
+class CountingSink:
+    """Discards the outputs, only counting them."""
+
+    def __init__(self):
+        self.count = 0
+
+    def append(self, value):  # pylint: disable=unused-argument
+        self.count += 1
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def clear(self):
+        pass
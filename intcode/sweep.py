@@ -0,0 +1,59 @@
+import functools
+import itertools
+import multiprocessing
+import os
+
+
+# set in every worker process by _initialize
+_program = None
+_cancelled = None
+
+
+def _initialize(program, cancelled):
+    global _program, _cancelled  # pylint: disable=global-statement
+    _program, _cancelled = program, cancelled
+
+
+def _run_chunk(function, chunk):
+    # chunks which were still queued when the sweep got cancelled are skipped
+    if _cancelled.is_set():
+        return []
+    return [(parameter, function(_program, parameter)) for parameter in chunk]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def sweep(function, program, parameters, processes=None, chunk_size=64):
+    """Yields (parameter, function(program, parameter)) for all parameters as they are computed.
+
+    The parameters are split into chunks which are spread over a pool of worker processes, the
+    program is sent to every worker once when it starts. Results arrive in completion order, not
+    in the order of the parameters. Closing the generator, e.g. by breaking out of a loop over it,
+    cancels the chunks which have not been started yet and stops the workers. There are never more
+    workers than chunks, a sweep fitting into a single chunk runs in this process without a pool.
+    function has to be picklable, i.e. defined at the top level of a module.
+    """
+    processes = processes or os.cpu_count()
+    chunks = chunked(parameters, chunk_size)
+    # look ahead just far enough to know whether every worker gets a chunk
+    first = list(itertools.islice(chunks, processes))
+    processes = min(processes, len(first))
+    if processes <= 1:
+        for parameter in itertools.chain.from_iterable(itertools.chain(first, chunks)):
+            yield parameter, function(program, parameter)
+        return
+    cancelled = multiprocessing.Event()
+    with multiprocessing.Pool(processes, _initialize, (program, cancelled)) as pool:
+        try:
+            for results in pool.imap_unordered(
+                    functools.partial(_run_chunk, function), itertools.chain(first, chunks)):
+                yield from results
+        finally:
+            cancelled.set()
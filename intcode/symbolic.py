@@ -0,0 +1,215 @@
+import itertools
+
+from .memory import PagedMemory
+from .opcodes import MODE, OPCODE, WRITE_PARAMETERS, split_instruction
+
+
+class SymbolicError(ValueError):
+    """Raised when a symbolic value would decide control flow, an address or a comparison."""
+
+
+class _Unknown:
+    """The value read from a symbolic address, anything computed from it is unknown as well."""
+
+    def __add__(self, other):
+        return self
+
+    __radd__ = __mul__ = __rmul__ = __add__
+
+    def __repr__(self):
+        return 'UNKNOWN'
+
+
+UNKNOWN = _Unknown()
+
+
+class Polynomial:
+    """An integer polynomial over named variables.
+
+    terms maps monomials, sorted tuples of (variable, power) pairs, to their coefficients.
+    Arithmetic with a result without any variables returns a plain int, with UNKNOWN it returns
+    UNKNOWN.
+    """
+
+    __slots__ = ('terms',)
+
+    def __init__(self, terms):
+        self.terms = terms
+
+    @classmethod
+    def variable(cls, name):
+        return cls({((name, 1),): 1})
+
+    @staticmethod
+    def _normalize(terms):
+        terms = {monomial: value for monomial, value in terms.items() if value != 0}
+        if not terms or list(terms) == [()]:
+            return terms.get((), 0)
+        return Polynomial(terms)
+
+    @staticmethod
+    def _terms(value):
+        return value.terms if isinstance(value, Polynomial) else {(): value}
+
+    def __add__(self, other):
+        if other is UNKNOWN:
+            return UNKNOWN
+        terms = dict(self.terms)
+        for monomial, value in self._terms(other).items():
+            terms[monomial] = terms.get(monomial, 0) + value
+        return self._normalize(terms)
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if other is UNKNOWN:
+            return UNKNOWN
+        terms = {}
+        for (monomial1, value1), (monomial2, value2) in itertools.product(
+                self.terms.items(), self._terms(other).items()):
+            powers = dict(monomial1)
+            for name, power in monomial2:
+                powers[name] = powers.get(name, 0) + power
+            monomial = tuple(sorted(powers.items()))
+            terms[monomial] = terms.get(monomial, 0) + value1 * value2
+        return self._normalize(terms)
+
+    __rmul__ = __mul__
+
+    @property
+    def variables(self):
+        return sorted({name for monomial in self.terms for name, _ in monomial})
+
+    def degree(self, name):
+        return max(dict(monomial).get(name, 0) for monomial in self.terms)
+
+    def substitute(self, name, value):
+        terms = {}
+        for monomial, coefficient in self.terms.items():
+            powers = dict(monomial)
+            power = powers.pop(name, 0)
+            monomial = tuple(sorted(powers.items()))
+            terms[monomial] = terms.get(monomial, 0) + coefficient * value ** power
+        return self._normalize(terms)
+
+    def __repr__(self):
+        def monomial_repr(monomial, coefficient):
+            factors = [name if power == 1 else f'{name}^{power}' for name, power in monomial]
+            if coefficient != 1 or not factors:
+                factors.insert(0, str(coefficient))
+            return '*'.join(factors)
+        return ' + '.join(
+            monomial_repr(monomial, coefficient)
+            for monomial, coefficient in sorted(self.terms.items(), reverse=True)
+        )
+
+
+def _concrete(value, what, ip):
+    if value is UNKNOWN:
+        raise SymbolicError(f'{what} at address {ip} depends on a symbolic address')
+    if isinstance(value, Polynomial):
+        raise SymbolicError(f'{what} at address {ip} depends on {", ".join(value.variables)}')
+    return value
+
+
+def execute_symbolic(program, symbols, inputs=(), max_instructions=1000000):
+    """Runs a program with some of its cells replaced by symbolic values (usually polynomial
+    variables) and returns the final memory and the outputs.
+
+    Additions and multiplications of symbolic values give polynomials. Reading from a symbolic
+    address gives UNKNOWN, which is fine as long as the value is overwritten before it matters.
+    Anything else which would have to look at a symbolic value, such as a written address, a jump
+    or a comparison, raises a SymbolicError, the program then has to be run concretely. So do
+    invalid instructions, negative addresses and inputs beyond the given ones, the concrete run
+    can report them like for any other machine.
+    """
+    memory = PagedMemory(program)
+    for address, value in symbols.items():
+        memory[address] = value
+    inputs, outputs = list(inputs), []
+    ip = base = 0
+    for _ in range(max_instructions):
+        if ip < 0:
+            raise SymbolicError(f'jump to negative address {ip}')
+        instruction = _concrete(memory[ip], 'instruction', ip)
+        try:
+            opcode, modes = split_instruction(instruction)
+        except ValueError as error:
+            raise SymbolicError(f'invalid instruction {instruction} at address {ip}') from error
+        writes = WRITE_PARAMETERS.get(opcode, ())
+        addresses, arguments = [], []
+        for index, mode in enumerate(modes):
+            parameter = ip + 1 + index
+            if mode == MODE.IMMEDIATE:
+                address = parameter
+            else:
+                address = memory[parameter]
+                if isinstance(address, (Polynomial, _Unknown)) and index not in writes:
+                    addresses.append(None)
+                    arguments.append(UNKNOWN)
+                    continue
+                address = _concrete(address, 'address', ip)
+                if mode == MODE.RELATIVE:
+                    address += base
+                if address < 0:
+                    raise SymbolicError(f'negative address {address} at address {ip}')
+            addresses.append(address)
+            arguments.append(memory[address] if index not in writes else None)
+        next_ip = ip + 1 + len(modes)
+        if opcode == OPCODE.HALT:
+            return memory, outputs
+        if opcode == OPCODE.ADD:
+            memory[addresses[2]] = arguments[0] + arguments[1]
+        elif opcode == OPCODE.MULTIPLY:
+            memory[addresses[2]] = arguments[0] * arguments[1]
+        elif opcode == OPCODE.INPUT:
+            if not inputs:
+                raise SymbolicError(f'input at address {ip} without any inputs left')
+            memory[addresses[0]] = inputs.pop(0)
+        elif opcode == OPCODE.OUTPUT:
+            outputs.append(arguments[0])
+        elif opcode in (OPCODE.JUMP_IF_TRUE, OPCODE.JUMP_IF_FALSE):
+            if (_concrete(arguments[0], 'jump', ip) != 0) == (opcode == OPCODE.JUMP_IF_TRUE):
+                next_ip = _concrete(arguments[1], 'jump', ip)
+        elif opcode == OPCODE.LESS_THAN:
+            arg1, arg2 = (_concrete(argument, 'comparison', ip) for argument in arguments[:2])
+            memory[addresses[2]] = int(arg1 < arg2)
+        elif opcode == OPCODE.EQUALS:
+            arg1, arg2 = (_concrete(argument, 'comparison', ip) for argument in arguments[:2])
+            memory[addresses[2]] = int(arg1 == arg2)
+        elif opcode == OPCODE.ADJUST:
+            base += _concrete(arguments[0], 'relative base adjustment', ip)
+        ip = next_ip
+    raise SymbolicError(f'no halt within {max_instructions} instructions')
+
+
+def solve(expression, target, ranges):
+    """Yields the assignments, as dicts, of the variables in ranges for which expression equals
+    target. Variables are assigned in the order of ranges, the last one is solved for directly if
+    the expression is linear in it."""
+    names = list(ranges)
+    if expression is UNKNOWN:
+        raise SymbolicError('the expression depends on a symbolic address')
+    if isinstance(expression, Polynomial) and not set(expression.variables) <= set(names):
+        raise ValueError(f'no range for {", ".join(set(expression.variables) - set(names))}')
+    if not isinstance(expression, Polynomial):
+        if expression == target:
+            for values in itertools.product(*ranges.values()):
+                yield dict(zip(names, values))
+        return
+    if len(names) == 1:
+        name = names[0]
+        if expression.degree(name) == 1:
+            constant = expression.substitute(name, 0)
+            slope = expression.substitute(name, 1) - constant
+            if (target - constant) % slope == 0 and (target - constant) // slope in ranges[name]:
+                yield {name: (target - constant) // slope}
+        else:
+            for value in ranges[name]:
+                if expression.substitute(name, value) == target:
+                    yield {name: value}
+        return
+    name, rest = names[0], {other: ranges[other] for other in names[1:]}
+    for value in ranges[name]:
+        for solution in solve(expression.substitute(name, value), target, rest):
+            yield dict(solution, **{name: value})
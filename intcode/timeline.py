@@ -0,0 +1,141 @@
+import contextlib
+import json
+import os
+import time
+
+from .compiler import CompiledIntCodeInterpreter
+from .interpreter import IntCodeInterpreter
+
+
+class Timeline:
+    """Events in the Chrome trace event format, to be loaded into chrome://tracing or Perfetto.
+
+    Every machine and host gets a track of its own (a thread in the viewer). Spans are complete
+    ('X') events, single moments instant ('i') events, timestamps are microseconds since the
+    timeline was created.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        self.events = []
+        self.tracks = {}
+
+    def now(self):
+        return (time.perf_counter() - self.start) * 1e6
+
+    def track(self, name):
+        """Returns the id of the track called name, creating it on first use."""
+        tid = self.tracks.get(name)
+        if tid is None:
+            tid = self.tracks[name] = len(self.tracks) + 1
+            self.events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                'args': {'name': name},
+            })
+        return tid
+
+    def complete(self, name, tid, start, end=None, **args):
+        if end is None:
+            end = self.now()
+        self.events.append({
+            'name': name, 'ph': 'X', 'pid': self.pid, 'tid': tid, 'ts': start, 'dur': end - start,
+            'args': args,
+        })
+
+    def instant(self, name, tid, **args):
+        self.events.append({
+            'name': name, 'ph': 'i', 's': 't', 'pid': self.pid, 'tid': tid, 'ts': self.now(),
+            'args': args,
+        })
+
+    @contextlib.contextmanager
+    def span(self, name, track='host', **args):
+        """Records the time spent in the with block as a span on track, e.g. host side work."""
+        tid, start = self.track(track), self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, tid, start, **args)
+
+    def as_dict(self):
+        return {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            file.write(self.to_json())
+
+
+class TimelineMixin:
+    """Records what a machine does on a track of timeline: spans for every run of the dispatch
+    loop and every wait for an input, instants for every output handed to the host by run() and
+    every input resuming the machine. All of them carry the instruction count."""
+
+    def __init__(self, program, inputs=None, timeline=None, name='machine'):
+        super().__init__(program, inputs=inputs)
+        self.timeline = timeline if timeline is not None else Timeline()
+        self.tid = self.timeline.track(name)
+        self._blocked_since = None
+
+    def _run_slice(self, budget):
+        timeline, start, count = self.timeline, self.timeline.now(), self.instruction_count
+        try:
+            return super()._run_slice(budget)
+        finally:
+            timeline.complete(
+                'run', self.tid, start, instructions=self.instruction_count - count,
+                instruction_count=self.instruction_count,
+            )
+
+    def _store_input(self, instruction, value):
+        self.timeline.instant(
+            'resume', self.tid, value=value, instruction_count=self.instruction_count,
+        )
+        super()._store_input(instruction, value)
+
+    def _next_input(self):
+        try:
+            return super()._next_input()
+        except IndexError:
+            # execute() ran out of inputs, the wait ends when the host calls it again
+            self._blocked_since = self.timeline.now()
+            raise
+
+    def _wait_for_input(self):
+        start = self.timeline.now()
+        value = yield from super()._wait_for_input()
+        self.timeline.complete('wait', self.tid, start, instruction_count=self.instruction_count)
+        return value
+
+    def execute(self):
+        if self._blocked_since is not None:
+            self.timeline.complete(
+                'wait', self.tid, self._blocked_since, instruction_count=self.instruction_count,
+            )
+            self._blocked_since = None
+        super().execute()
+
+    def run(self):
+        machine = super().run()
+        value = None
+        while True:
+            try:
+                output = machine.send(value)
+            except StopIteration:
+                return
+            if output is not None:
+                self.timeline.instant(
+                    'output', self.tid, value=output, instruction_count=self.instruction_count,
+                )
+            value = yield output
+
+
+class TimelineIntCodeInterpreter(TimelineMixin, IntCodeInterpreter):
+    pass
+
+
+class TimelineCompiledIntCodeInterpreter(TimelineMixin, CompiledIntCodeInterpreter):
+    pass
@@ -0,0 +1,174 @@
+import pickle
+
+from .compiler import CompiledIntCodeInterpreter
+from .interpreter import IntCodeInterpreter
+from .opcodes import OPCODE
+
+
+INPUT = 'input'
+OUTPUT = 'output'
+
+
+class ReplayError(RuntimeError):
+    """Raised when a replayed machine does not do what the trace says it did."""
+
+
+class Trace:
+    """The I/O of a recorded run: events are (INPUT or OUTPUT, value) pairs in the order they
+    happened, checkpoints map event indices to snapshots taken right before those events."""
+
+    def __init__(self, program, interval):
+        self.program = list(program)
+        self.interval = interval
+        self.events = []
+        self.checkpoints = {}
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            pickle.dump(self, file)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+
+
+class RecordingMixin:
+    """Records the I/O of a machine into self.trace, taking a snapshot every interval events.
+
+    Checkpoints are taken when the machine is about to read an input, the only point at which its
+    state does not depend on how far a host has consumed the outputs.
+    """
+
+    def __init__(self, program, inputs=None, interval=1000):
+        super().__init__(program, inputs=inputs)
+        self.trace = Trace(self.memory.cells(0, len(self.memory.image)), interval)
+        self._checkpointed = None
+
+    def fork(self):
+        # the child records a trace of its own, which starts at the fork
+        child = super().fork()
+        child.trace = Trace(child.memory.cells(0, len(child.memory.image)), self.trace.interval)
+        child._checkpointed = None
+        return child
+
+    def _checkpoint(self):
+        index = len(self.trace.events)
+        if self._checkpointed is None or index - self._checkpointed >= self.trace.interval:
+            self.trace.checkpoints[index] = self.snapshot()
+            self._checkpointed = index
+
+    def _run(self):
+        if self._checkpointed is None:
+            # taken on the first run, after the host patched the program
+            self.trace.program = self.memory.cells(0, len(self.memory.image))
+            self._checkpoint()
+        start = len(self.outputs)
+        instruction = super()._run()
+        self.trace.events.extend((OUTPUT, value) for value in self.outputs[start:])
+        return instruction
+
+    def _store_input(self, instruction, value):
+        self._checkpoint()
+        self.trace.events.append((INPUT, value))
+        super()._store_input(instruction, value)
+
+
+class RecordingIntCodeInterpreter(RecordingMixin, IntCodeInterpreter):
+    pass
+
+
+class RecordingCompiledIntCodeInterpreter(RecordingMixin, CompiledIntCodeInterpreter):
+    pass
+
+
+def _same_state(interpreter, snapshot):
+    memory, expected = interpreter.memory, snapshot.memory
+    return (
+        interpreter.instruction_pointer == snapshot.instruction_pointer
+        and interpreter.base_address == snapshot.base_address
+        and list(memory.image) == list(expected.image)
+        and memory.pages == expected.pages
+    )
+
+
+class Replayer:
+    """Replays a trace deterministically.
+
+    seek() restores the checkpoint closest before a step and only re-executes the events from
+    there, checking every output against the trace.
+    """
+
+    def __init__(self, trace, interpreter_class=CompiledIntCodeInterpreter):
+        self.trace = trace
+        self.interpreter_class = interpreter_class
+
+    def _restore(self, index):
+        interpreter = self.interpreter_class(self.trace.program)
+        interpreter.restore(self.trace.checkpoints[index])
+        # the recorded inputs are fed from the trace instead
+        interpreter.inputs, interpreter.input_index = [], 0
+        return interpreter
+
+    def seek(self, step):
+        """Returns a machine which has gone through the first step events of the trace."""
+        if not 0 <= step <= len(self.trace.events):
+            raise ValueError(f'step {step} outside of the trace of {len(self.trace.events)} events')
+        index = max(index for index in self.trace.checkpoints if index <= step)
+        interpreter = self._restore(index)
+        # the outputs before the checkpoint come from the trace, as if they had been produced
+        interpreter.outputs = [value for kind, value in self.trace.events[:index] if kind == OUTPUT]
+        self._replay(interpreter, index, step)
+        return interpreter
+
+    def verify(self):
+        """Replays the trace of a finished run from the start, comparing the machine to every
+        checkpoint on the way, and returns the halted machine."""
+        interpreter = self._restore(0)
+        checkpoints = sorted(self.trace.checkpoints)
+        for start, stop in zip(checkpoints, checkpoints[1:] + [len(self.trace.events)]):
+            if not _same_state(interpreter, self.trace.checkpoints[start]):
+                raise ReplayError(f'machine differs from the checkpoint at step {start}')
+            self._replay(interpreter, start, stop)
+        outputs = len(interpreter.outputs)
+        instruction = interpreter._run()  # pylint: disable=protected-access
+        if instruction.opcode != OPCODE.HALT or len(interpreter.outputs) != outputs:
+            raise ReplayError('machine did not halt at the end of the trace')
+        return interpreter
+
+    def _replay(self, interpreter, index, stop):
+        events = self.trace.events
+        while index < stop:
+            kind, value = events[index]
+            if kind == INPUT:
+                instruction = interpreter.decode(interpreter.instruction_pointer)
+                if instruction.opcode != OPCODE.INPUT:
+                    raise ReplayError(f'expected an input at step {index}')
+                interpreter._store_input(instruction, value)  # pylint: disable=protected-access
+                index += 1
+                continue
+            outputs = interpreter.outputs
+            start = len(outputs)
+            # an input right at stop still lets the machine run up to it
+            following = next((
+                other for other in range(index, min(stop + 1, len(events)))
+                if events[other][0] == INPUT
+            ), None)
+            if following is not None:
+                # all outputs up to the next input, at full speed
+                instruction = interpreter._run()  # pylint: disable=protected-access
+                produced = [(OUTPUT, output) for output in outputs[start:]]
+                if instruction.opcode != OPCODE.INPUT or produced != events[index:following]:
+                    raise ReplayError(f'outputs differ from the trace between steps {index} and '
+                                      f'{following}')
+                index = following
+                continue
+            # stop right after the output of step stop - 1, instruction by instruction
+            while len(outputs) == start:
+                if interpreter.decode(interpreter.instruction_pointer).opcode in (
+                        OPCODE.INPUT, OPCODE.HALT):
+                    raise ReplayError(f'expected output {value} at step {index}')
+                interpreter.step()
+            if outputs[-1] != value:
+                raise ReplayError(f'output {outputs[-1]} instead of {value} at step {index}')
+            index += 1
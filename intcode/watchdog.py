@@ -0,0 +1,167 @@
+from collections import namedtuple
+import time
+
+from .interpreter import IntCodeInterpreter
+from .memory import PAGE_BITS
+from .opcodes import OPCODE
+
+
+HALTED = 'halted'
+WAITING = 'waiting'
+CYCLE = 'cycle'
+INSTRUCTION_BUDGET = 'instruction budget'
+TIME_BUDGET = 'time budget'
+ERROR = 'error'
+
+# how a supervised run ended, error holds the exception for CYCLE and ERROR
+Status = namedtuple('Status', field_names=[
+    'outcome', 'instructions', 'seconds', 'instruction_pointer', 'error',
+])
+
+MASK = (1 << 64) - 1
+
+
+class CycleError(RuntimeError):
+    """Raised when a machine gets back into a state it was in before without reading an input in
+    between, i.e. when it is never going to halt."""
+
+    def __init__(self, instruction_pointer, period):
+        super().__init__(
+            f'machine loops at address {instruction_pointer} every {period} backward jumps'
+        )
+        self.instruction_pointer = instruction_pointer
+        self.period = period
+
+
+def _cell_hash(address, value):
+    # cells holding 0 do not count, so pages which were never written to do not either
+    return hash((address, value)) if value else 0
+
+
+class CycleDetectingIntCodeInterpreter(IntCodeInterpreter):
+    """An IntCodeInterpreter raising a CycleError instead of looping forever.
+
+    The state of the machine is its instruction pointer, its base address and its memory, which
+    is hashed incrementally on every write. The state is checked at every backward jump with
+    Brent's algorithm: it is compared to the one saved at the last power of two jumps, so a cycle
+    is found within twice its length after it was entered while only one state is kept. A match of
+    the hashes is confirmed by comparing the memory itself.
+    """
+
+    def __init__(self, program, inputs=None, **kwargs):
+        super().__init__(program, inputs=inputs, **kwargs)
+        self.memory_hash = self._hash_memory()
+        self._forget_states()
+
+    def _hash_memory(self):
+        memory, total = self.memory, 0
+        for address, value in enumerate(memory.image):
+            total += _cell_hash(address, value)
+        for number, page in memory.pages.items():
+            for address, value in enumerate(page, start=number << PAGE_BITS):
+                total += _cell_hash(address, value)
+        return total & MASK
+
+    def _forget_states(self):
+        self._saved_state = self._saved_memory = None
+        self._jumps, self._power = 0, 1
+
+    def write(self, address, value):
+        old = self.memory[address]
+        self.memory_hash = (
+            self.memory_hash - _cell_hash(address, old) + _cell_hash(address, value)
+        ) & MASK
+        super().write(address, value)
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        self.memory_hash = self._hash_memory()
+        self._forget_states()
+
+    def _store_input(self, instruction, value):
+        # an input may lead anywhere, the states before it say nothing about those after it
+        super()._store_input(instruction, value)
+        self._forget_states()
+
+    def _same_memory(self, memory):
+        return list(self.memory.image) == list(memory.image) and self.memory.pages == memory.pages
+
+    def _check_cycle(self, ip):
+        # returns whether the state was saved, which shares the image with the saved memory
+        state = (ip, self.base_address, self.memory_hash)
+        self._jumps += 1
+        if state == self._saved_state and self._same_memory(self._saved_memory):
+            raise CycleError(ip, self._jumps)
+        if self._jumps < self._power:
+            return False
+        self._saved_state, self._saved_memory = state, self.memory.fork()
+        self._jumps, self._power = 0, self._power * 2
+        return True
+
+    def _run_slice(self, budget):
+        memory = self.memory
+        image = memory if memory.image_shared else memory.image
+        ip, count = self.instruction_pointer, self.instruction_count
+        limit = None if budget is None else count + budget
+        try:
+            while limit is None or count < limit:
+                if image is memory and not memory.image_shared:
+                    image = memory.image
+                instruction = self._decoded.get(ip)
+                if instruction is None:
+                    instruction = self.decode(ip)
+                handler = instruction.handler
+                if handler is None:
+                    return instruction
+                try:
+                    next_ip = handler(self, image, ip, instruction.operands)
+                except IndexError:
+                    next_ip = handler(self, memory, ip, instruction.operands)
+                count += 1
+                backward, ip = next_ip <= ip, next_ip
+                if backward and self._check_cycle(ip):
+                    image = memory
+            return None
+        finally:
+            self.instruction_pointer, self.instruction_count = ip, count
+
+
+def supervise(interpreter, max_instructions=None, max_seconds=None, slice_instructions=10000):
+    """Runs a machine until it halts or needs an input it has not got and returns a Status.
+
+    Instead of hanging or raising, the run also ends when the machine loops (which only a
+    CycleDetectingIntCodeInterpreter notices), executed max_instructions instructions, ran for
+    max_seconds or raised an error. The time is checked every slice_instructions instructions.
+    """
+    start, first = time.perf_counter(), interpreter.instruction_count
+    outcome = error = None
+    while outcome is None:
+        budget = slice_instructions
+        if max_instructions is not None:
+            left = max_instructions - (interpreter.instruction_count - first)
+            if left <= 0:
+                outcome = INSTRUCTION_BUDGET
+                break
+            budget = min(budget, left)
+        if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+            outcome = TIME_BUDGET
+            break
+        try:
+            instruction = interpreter._run_slice(budget)  # pylint: disable=protected-access
+            if instruction is None:
+                continue
+            if instruction.opcode == OPCODE.HALT:
+                outcome = HALTED
+            elif interpreter.input_index < len(interpreter.inputs):
+                # pylint: disable=protected-access
+                interpreter._store_input(instruction, interpreter._next_input())
+            else:
+                outcome = WAITING
+        except CycleError as exception:
+            outcome, error = CYCLE, exception
+        except Exception as exception:  # pylint: disable=broad-except
+            outcome, error = ERROR, exception
+    return Status(
+        outcome, interpreter.instruction_count - first, time.perf_counter() - start,
+        interpreter.instruction_pointer, error,
+    )